@@ -1,62 +1,709 @@
 #!/usr/bin/env python3
 
+import argparse
 import json
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import re
+import sqlite3
 import sys
 from datetime import datetime
 
-class BenchmarkAnalyzer:
-    def __init__(self):
-        self.results = {}
+# Linux prices in USD per hour (us-east-1 on-demand list prices). Spot prices change
+# constantly, so they are left empty here and supplied with --prices.
+INSTANCE_PRICES = {
+    "c5.xlarge": {"on_demand": 0.17, "spot": None},
+    "c6i.xlarge": {"on_demand": 0.17, "spot": None},
+    "c7i.xlarge": {"on_demand": 0.1785, "spot": None},
+    "c7a.xlarge": {"on_demand": 0.20527, "spot": None},
+    "c6g.xlarge": {"on_demand": 0.136, "spot": None},
+    "c7g.xlarge": {"on_demand": 0.145, "spot": None},
+    "c8g.xlarge": {"on_demand": 0.15952, "spot": None}
+}
+
+# Bootstrap settings for confidence intervals (fixed seed keeps reports reproducible)
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE_LEVEL = 0.95
+
+# Outliers are only rejected from this many repetitions up; with fewer, the median
+# absolute deviation is too unstable and drops valid samples from clean runs
+OUTLIER_MIN_SAMPLES = 10
+
+# Column order of the ISA ablation table (levels from benchmark-runner.py ISA_LEVELS)
+ISA_LEVEL_ORDER = ['c', 'sse2', 'sse4.2', 'avx2', 'avx512', 'neon', 'native']
+
+# Content complexity tiers of build-corpus.py clips, easiest first
+COMPLEXITY_TIER_ORDER = ['low', 'medium', 'high']
+
+# A baseline comparison only counts a change beyond this fraction, or beyond
+# NOISE_MULTIPLIER times the run-to-run coefficient of variation if that is larger
+REGRESSION_THRESHOLD = 0.05
+NOISE_MULTIPLIER = 3
+
+# Baseline comparison statuses that make --compare-baseline exit non-zero
+GATE_FAILURES = ('regression', 'failed', 'missing', 'no candidate run')
+
+def reject_outliers(values, threshold=3.5):
+    """Drop samples whose modified z-score (median absolute deviation) exceeds the threshold"""
+    values = np.asarray(values, dtype=float)
+    if len(values) < OUTLIER_MIN_SAMPLES:
+        return values
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return values
+    return values[0.6745 * np.abs(values - median) / mad <= threshold]
+
+def bootstrap_medians(values, seed=0):
+    """Medians of bootstrap resamples of the values"""
+    rng = np.random.default_rng(seed)
+    samples = rng.choice(values, size=(BOOTSTRAP_RESAMPLES, len(values)), replace=True)
+    return np.median(samples, axis=1)
+
+def confidence_interval(estimates):
+    """Percentile confidence interval of bootstrap estimates"""
+    tail = (1 - CONFIDENCE_LEVEL) / 2 * 100
+    return np.percentile(estimates, tail), np.percentile(estimates, 100 - tail)
+
+def summarize_samples(values):
+    """Median, spread and bootstrap confidence interval of repeated measurements"""
+    raw = np.asarray([v for v in values if not pd.isna(v)], dtype=float)
+    kept = reject_outliers(raw)
+    if len(kept) == 0:
+        return None
+    std = np.std(kept, ddof=1) if len(kept) > 1 else 0.0
+    mean = np.mean(kept)
+    ci_low, ci_high = confidence_interval(bootstrap_medians(kept)) if len(kept) > 1 else (np.nan, np.nan)
+    return {
+        'n': len(kept),
+        'outliers': len(raw) - len(kept),
+        'median': np.median(kept),
+        'mean': mean,
+        'std': std,
+        'cv': std / mean if mean > 0 else np.nan,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'values': kept
+    }
+
+def compare_samples(baseline, candidate, seed=0):
+    """Ratio of medians (baseline / candidate) with a bootstrap CI and significance flag"""
+    ratio = np.median(baseline) / np.median(candidate)
+    if len(baseline) < 2 or len(candidate) < 2:
+        return ratio, np.nan, np.nan, False
+    ratios = bootstrap_medians(baseline, seed) / bootstrap_medians(candidate, seed + 1)
+    ci_low, ci_high = confidence_interval(ratios)
+    return ratio, ci_low, ci_high, bool(ci_low > 1 or ci_high < 1)
+
+def compare_matched_samples(pairs, seed=0):
+    """Geometric mean of per-test ratios of medians (baseline / candidate) with a bootstrap CI and significance flag.
+    
+    Each pair holds the baseline and candidate samples of the same test, so
+    different inputs and resolutions are never pooled into one sample.
+    """
+    ratio = float(np.exp(np.mean([np.log(np.median(baseline) / np.median(candidate)) for baseline, candidate in pairs])))
+    if any(len(baseline) < 2 or len(candidate) < 2 for baseline, candidate in pairs):
+        return ratio, np.nan, np.nan, False
+    log_ratios = np.mean([np.log(bootstrap_medians(baseline, seed + 2 * i) / bootstrap_medians(candidate, seed + 2 * i + 1))
+                          for i, (baseline, candidate) in enumerate(pairs)], axis=0)
+    ci_low, ci_high = confidence_interval(np.exp(log_ratios))
+    return ratio, ci_low, ci_high, bool(ci_low > 1 or ci_high < 1)
+
+def pareto_frontier(df, maximize, minimize):
+    """Boolean Series marking rows that no other row dominates.
+    
+    A row is dominated if another row is at least as good on every objective
+    and strictly better on one.
+    """
+    values = np.column_stack([df[c].values for c in maximize] + [-df[c].values for c in minimize]).astype(float)
+    optimal = []
+    for i in range(len(values)):
+        better_or_equal = np.all(values >= values[i], axis=1)
+        strictly_better = np.any(values > values[i], axis=1)
+        optimal.append(not np.any(better_or_equal & strictly_better))
+    return pd.Series(optimal, index=df.index)
+
+def fit_amdahl(threads, speedups):
+    """Least-squares parallel fraction p of Amdahl's law S(n) = 1 / ((1 - p) + p / n).
+    
+    Rearranged as 1 - 1/S = p * (1 - 1/n), which is linear in p through the origin.
+    """
+    x = 1 - 1 / np.asarray(threads, dtype=float)
+    y = 1 - 1 / np.asarray(speedups, dtype=float)
+    if np.sum(x * x) == 0:
+        return 0.0
+    return float(np.clip(np.sum(x * y) / np.sum(x * x), 0.0, 1.0))
+
+class ResultStore:
+    """SQLite store that keeps every ingested benchmark run.
+    
+    Each result file becomes one row in ``runs`` (keyed by its run id) plus
+    rows in ``results`` and in one table per summary section such as
+    ``concurrency_results``. Log text is never stored, nested values are
+    kept as JSON, and columns are added as new result fields appear.
+    """
+    LOG_FIELDS = ('stderr', 'stdout')
+    
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ingested_files (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, run_id TEXT);
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY, source TEXT, instance_type TEXT, architecture TEXT, hostname TEXT,
+                ffmpeg_version TEXT, timestamp TEXT, cpu_count INTEGER, memory_total INTEGER, system_info TEXT
+            );
+            CREATE TABLE IF NOT EXISTS results (run_id TEXT);
+            CREATE TABLE IF NOT EXISTS baselines (
+                name TEXT, instance_type TEXT, ffmpeg_version TEXT, run_id TEXT, created TEXT,
+                PRIMARY KEY (name, instance_type)
+            );
+            CREATE INDEX IF NOT EXISTS results_run_id ON results (run_id);
+            CREATE INDEX IF NOT EXISTS runs_instance_type ON runs (instance_type);
+        """)
+    
+    def tables(self):
+        return [row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    
+    def table_columns(self, table):
+        return [row[1] for row in self.conn.execute(f'PRAGMA table_info("{table}")')]
+    
+    def ensure_table(self, table, keys):
+        """Create a section table and add any columns it does not have yet"""
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (run_id TEXT)')
+        existing = set(self.table_columns(table))
+        for key in keys:
+            if key not in existing:
+                self.conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{key}"')
+                existing.add(key)
+    
+    def insert_rows(self, table, run_id, rows):
+        """Insert dict rows, storing booleans as integers and nested values as JSON"""
+        for row in rows:
+            row = {k: v for k, v in row.items() if k not in self.LOG_FIELDS and k != 'run_id'}
+            
+            # Resumed runs carry results already ingested from the run that produced them
+            if table == 'results' and row.get('fingerprint') and 'fingerprint' in self.table_columns(table):
+                duplicate = self.conn.execute('SELECT 1 FROM results WHERE fingerprint = ? AND timestamp = ?',
+                                              (row['fingerprint'], row.get('timestamp'))).fetchone()
+                if duplicate:
+                    continue
+            
+            self.ensure_table(table, row.keys())
+            values = [run_id] + [json.dumps(v) if isinstance(v, (dict, list)) else v for v in row.values()]
+            columns = ", ".join(f'"{k}"' for k in ['run_id'] + list(row.keys()))
+            placeholders = ", ".join("?" for _ in values)
+            self.conn.execute(f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})', values)
+    
+    def delete_run(self, run_id):
+        # Baselines point at runs by id and must survive a run being ingested again
+        for table in self.tables():
+            if 'run_id' in self.table_columns(table) and table not in ('ingested_files', 'baselines'):
+                self.conn.execute(f'DELETE FROM "{table}" WHERE run_id = ?', (run_id,))
+    
+    def add_run(self, run_id, data, source=None):
+        """Store one runner output document, replacing an earlier copy of the same run"""
+        self.delete_run(run_id)
+        self.append_run(run_id, data, source)
+    
+    def append_run(self, run_id, data, source=None):
+        """Add results to a run, creating the run on first use (results streamed by workers)"""
+        system_info = data['system_info']
+        timestamps = [r['timestamp'] for r in data.get('benchmark_results', []) if r.get('timestamp')]
+        timestamp = data.get('run_timestamp') or (min(timestamps) if timestamps else None)
+        
+        self.conn.execute(
+            'INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (run_id, source, system_info.get('instance_type') or system_info.get('architecture'),
+             system_info.get('architecture'), system_info.get('hostname'), system_info.get('ffmpeg_version'),
+             timestamp, system_info.get('cpu_count'), system_info.get('memory_total'), json.dumps(system_info))
+        )
+        self.insert_rows('results', run_id, data.get('benchmark_results', []))
         
-    def load_results(self, results_dir="results"):
-        """Load all benchmark result files"""
-        for filename in os.listdir(results_dir):
+        # Every other list of summaries (concurrency_results, density_results, ...) gets its own table
+        for key, value in data.items():
+            if key.endswith('_results') and key != 'benchmark_results' and isinstance(value, list):
+                self.insert_rows(key, run_id, value)
+    
+    def ingest_file(self, path):
+        """Ingest a result file unless it is unchanged since the last ingestion"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        previous = self.conn.execute('SELECT size, mtime FROM ingested_files WHERE path = ?', (path,)).fetchone()
+        if previous == (stat.st_size, stat.st_mtime):
+            return False
+        
+        with open(path, 'r') as f:
+            data = json.load(f)
+        run_id = data.get('run_id') or os.path.splitext(os.path.basename(path))[0]
+        with self.conn:
+            self.add_run(run_id, data, source=path)
+            self.conn.execute('INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?)',
+                              (path, stat.st_size, stat.st_mtime, run_id))
+        return True
+    
+    def ingest_directory(self, results_dir):
+        """Ingest all new or changed benchmark result files in a directory"""
+        ingested = 0
+        for filename in sorted(os.listdir(results_dir)):
             if filename.endswith('.json') and 'ffmpeg_benchmark' in filename:
-                filepath = os.path.join(results_dir, filename)
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                    # Use instance_type if available, otherwise fall back to architecture
-                    instance_type = data['system_info'].get('instance_type', data['system_info']['architecture'])
-                    self.results[instance_type] = data
+                ingested += self.ingest_file(os.path.join(results_dir, filename))
+        return ingested
+    
+    def save_baseline(self, name, run):
+        """Record a run as the named baseline for its instance type"""
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO baselines VALUES (?, ?, ?, ?, ?)',
+                              (name, run['instance_type'], run['ffmpeg_version'], run['run_id'],
+                               datetime.now().isoformat()))
+    
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+class BenchmarkAnalyzer:
+    # Per-result time-series that the comparison DataFrame does not need
+    SERIES_COLUMNS = ('progress', 'resource_samples', 'per_core_utilization', 'frame_latencies')
+    
+    # Result fields the report expects even when no loaded run recorded them
+    RESULT_COLUMNS = (
+        'test_name', 'duration', 'avg_cpu_usage', 'max_cpu_usage', 'avg_memory_usage', 'cpu_seconds',
+        'cpu_seconds_per_frame', 'peak_rss_bytes', 'output_file_size', 'avg_fps', 'steady_state_fps',
+        'frames_encoded', 'video_duration', 'input_fps', 'decode_cache', 'decode_seconds', 'scale_seconds',
+        'real_time_factor', 'vmaf_score', 'sweep', 'codec', 'preset', 'threads', 'frame_threads', 'repetition',
+        'isa_ablation', 'isa_level', 'base_test', 'output_sink', 'read_bytes', 'write_bytes', 'read_chars',
+        'write_chars', 'iowait_seconds', 'quality_search', 'rate_control', 'rate_value', 'target_vmaf',
+        'content_clip', 'content_tier', 'content_source', 'content_resolution', 'content_fps', 'content_duration',
+        'latency', 'time_to_first_packet', 'latency_p50', 'latency_p99', 'latency_max', 'jitter', 'frames_over_budget',
+        'input_file', 'command'
+    )
+    
+    def __init__(self, pricing="on_demand"):
+        self.store = None
+        self.runs = pd.DataFrame()
+        self.comparison_df = None
+        self.pricing = pricing
+        self.prices = {instance_type: dict(prices) for instance_type, prices in INSTANCE_PRICES.items()}
+    
+    def load_prices(self, path):
+        """Override the built-in price table from a JSON file of {instance_type: {"on_demand": x, "spot": y}}"""
+        with open(path, 'r') as f:
+            for instance_type, prices in json.load(f).items():
+                self.prices.setdefault(instance_type, {}).update(prices)
+    
+    def price_per_hour(self, instance_type):
+        """Hourly price of an instance type under the selected pricing model"""
+        price = self.prices.get(instance_type, {}).get(self.pricing)
+        return price if price else np.nan
+        
+    def load_results(self, results_dir="results", db_path=None):
+        """Ingest new benchmark result files into the results store"""
+        self.store = ResultStore(db_path or os.path.join(results_dir, "benchmark_results.db"))
+        ingested = self.store.ingest_directory(results_dir) if os.path.isdir(results_dir) else 0
+        self.runs = self.store.query("SELECT * FROM runs")
+        self.comparison_df = None
         
-        print(f"Loaded results for instance types: {list(self.results.keys())}")
+        instance_types = sorted(self.runs['instance_type'].dropna().unique())
+        print(f"Ingested {ingested} new result files; {len(self.runs)} runs for instance types: {instance_types}")
+    
+    def query_section(self, table, columns):
+        """Query a summary section table joined with its run's instance type"""
+        if table not in self.store.tables():
+            return pd.DataFrame()
+        available = set(self.store.table_columns(table))
+        selected = ", ".join(f's."{c}"' if c in available else f'NULL AS "{c}"' for c in columns)
+        return self.store.query(f'SELECT runs.instance_type, s.run_id, {selected} FROM "{table}" s JOIN runs USING (run_id)')
     
     def create_comparison_dataframe(self):
         """Create DataFrame for comparison analysis"""
+        if self.comparison_df is not None:
+            return self.comparison_df
+        
+        columns = [c for c in self.store.table_columns('results') if c not in self.SERIES_COLUMNS and c != 'run_id']
+        if 'success' not in columns:
+            return pd.DataFrame()
+        
+        selected = ", ".join(f'r."{c}"' for c in columns)
+        df = self.store.query(
+            f'SELECT runs.instance_type, r.run_id, runs.hostname, runs.ffmpeg_version, runs.cpu_count, runs.memory_total, '
+            f'{selected} FROM results r JOIN runs USING (run_id) WHERE r.success = 1'
+        )
+        for column in self.RESULT_COLUMNS:
+            if column not in df.columns:
+                df[column] = np.nan
+        for column in ('decode_cache', 'sweep', 'isa_ablation', 'quality_search', 'latency'):
+            df[column] = df[column].fillna(0).astype(bool)
+        
+        # Results from before output sinks existed wrote to output/ on disk
+        df['output_sink'] = df['output_sink'].fillna('disk')
+        df['memory_total_gb'] = df['memory_total'] / (1024**3)
+        df['output_file_size_mb'] = df['output_file_size'] / (1024**2)
+        df['peak_rss_mb'] = df['peak_rss_bytes'] / (1024**2)
+        df['fps'] = self.calculate_fps(df)
+        
+        self.comparison_df = df
+        return df
+    
+    def latest_runs(self, run_ids=None):
+        """Latest run of each instance type, or the given runs"""
+        runs = self.runs
+        if run_ids:
+            return runs[runs['run_id'].isin(run_ids)]
+        return runs.sort_values('timestamp').groupby('instance_type').tail(1)
+    
+    def save_baseline(self, name, run_ids=None):
+        """Save the latest run of each instance type (or the given runs) as a named baseline"""
+        runs = self.latest_runs(run_ids)
+        for _, run in runs.iterrows():
+            self.store.save_baseline(name, run)
+            print(f"Baseline '{name}' for {run['instance_type']}: run {run['run_id']} (ffmpeg {run['ffmpeg_version'] or 'unknown'})")
+        return len(runs)
+    
+    def compare_to_baseline(self, name, run_ids=None, threshold=REGRESSION_THRESHOLD):
+        """Compare encode durations of candidate runs with the named baseline, test by test.
+        
+        The candidate for an instance type is its latest run other than the
+        baseline run. A change is significant when it exceeds the threshold
+        (widened to NOISE_MULTIPLIER times the coefficient of variation for
+        noisy tests) and, with repetitions on both sides, the bootstrap CI of
+        the duration ratio excludes 1. Baseline tests that failed or are
+        missing in the candidate, and instance types without a candidate
+        run, are reported with their own status and fail the gate too.
+        """
+        baselines = self.store.query('SELECT * FROM baselines WHERE name = ?', (name,))
+        if baselines.empty:
+            return pd.DataFrame()
+        
+        df = self.create_comparison_dataframe()
+        rows = []
+        for _, baseline in baselines.iterrows():
+            candidates = self.runs[(self.runs['instance_type'] == baseline['instance_type']) &
+                                   (self.runs['run_id'] != baseline['run_id'])]
+            if run_ids:
+                candidates = candidates[candidates['run_id'].isin(run_ids)]
+            if candidates.empty:
+                print(f"No candidate run for {baseline['instance_type']}")
+                rows.append({'instance_type': baseline['instance_type'], 'test_name': '(all)',
+                             'baseline_version': baseline['ffmpeg_version'] or 'unknown', 'candidate_version': 'N/A',
+                             'candidate_run_id': None, 'status': 'no candidate run'})
+                continue
+            candidate = candidates.sort_values('timestamp').iloc[-1]
+            
+            baseline_df = df[df['run_id'] == baseline['run_id']]
+            candidate_df = df[df['run_id'] == candidate['run_id']]
+            attempted = set(self.store.query('SELECT DISTINCT test_name FROM results WHERE run_id = ?',
+                                             (candidate['run_id'],))['test_name'])
+            for test_name in sorted(set(baseline_df['test_name']) - set(candidate_df['test_name'])):
+                rows.append({
+                    'instance_type': baseline['instance_type'],
+                    'test_name': test_name,
+                    'baseline_version': baseline['ffmpeg_version'] or 'unknown',
+                    'candidate_version': candidate['ffmpeg_version'] or 'unknown',
+                    'candidate_run_id': candidate['run_id'],
+                    'baseline_duration': baseline_df.loc[baseline_df['test_name'] == test_name, 'duration'].median(),
+                    'status': 'failed' if test_name in attempted else 'missing'
+                })
+            for test_name in sorted(set(baseline_df['test_name']) & set(candidate_df['test_name'])):
+                base = summarize_samples(baseline_df.loc[baseline_df['test_name'] == test_name, 'duration'])
+                new = summarize_samples(candidate_df.loc[candidate_df['test_name'] == test_name, 'duration'])
+                if base is None or new is None:
+                    continue
+                
+                ratio, ci_low, ci_high, significant = compare_samples(new['values'], base['values'])
+                noise = max(base['cv'] if base['n'] > 1 else 0, new['cv'] if new['n'] > 1 else 0)
+                tolerance = max(threshold, NOISE_MULTIPLIER * noise)
+                if base['n'] < 2 or new['n'] < 2:
+                    significant = True
+                
+                if ratio > 1 + tolerance and significant:
+                    status = 'regression'
+                elif ratio < 1 - tolerance and significant:
+                    status = 'improvement'
+                else:
+                    status = 'unchanged'
+                
+                rows.append({
+                    'instance_type': baseline['instance_type'],
+                    'test_name': test_name,
+                    'baseline_version': baseline['ffmpeg_version'] or 'unknown',
+                    'candidate_version': candidate['ffmpeg_version'] or 'unknown',
+                    'candidate_run_id': candidate['run_id'],
+                    'baseline_duration': base['median'],
+                    'candidate_duration': new['median'],
+                    'change': ratio - 1,
+                    'ci_low': ci_low - 1,
+                    'ci_high': ci_high - 1,
+                    'tolerance': tolerance,
+                    'status': status
+                })
+        return pd.DataFrame(rows, columns=['instance_type', 'test_name', 'baseline_version', 'candidate_version',
+                                           'candidate_run_id', 'baseline_duration', 'candidate_duration', 'change',
+                                           'ci_low', 'ci_high', 'tolerance', 'status'])
+    
+    def print_baseline_comparison(self, name, comparison):
+        """Print the regression/improvement table of a baseline comparison"""
+        print(f"Comparison with baseline '{name}' (change in encode duration; positive is slower)")
+        print("")
+        print("| Instance Type | Test | Baseline ffmpeg | Candidate ffmpeg | Baseline (s) | Candidate (s) | Change | 95% CI | Tolerance | Status |")
+        print("|---------------|------|-----------------|------------------|--------------|---------------|--------|--------|-----------|--------|")
+        def value(number, fmt):
+            return format(number, fmt) if not pd.isna(number) else "N/A"
+        
+        for _, row in comparison.sort_values(['instance_type', 'test_name']).iterrows():
+            ci = f"{row['ci_low']:+.1%} to {row['ci_high']:+.1%}" if not pd.isna(row['ci_low']) else "N/A"
+            status = row['status'].upper() if row['status'] in GATE_FAILURES else row['status']
+            tolerance = f"±{row['tolerance']:.1%}" if not pd.isna(row['tolerance']) else "N/A"
+            print(f"| {row['instance_type']} | {row['test_name']} | {row['baseline_version']} | {row['candidate_version']} | "
+                  f"{value(row['baseline_duration'], '.2f')} | {value(row['candidate_duration'], '.2f')} | "
+                  f"{value(row['change'], '+.1%')} | {ci} | {tolerance} | {status} |")
+        print("")
+        counts = comparison['status'].value_counts()
+        print(f"{counts.get('regression', 0)} regressions, {counts.get('improvement', 0)} improvements, "
+              f"{counts.get('unchanged', 0)} unchanged, {counts.get('failed', 0)} failed, {counts.get('missing', 0)} missing, "
+              f"{counts.get('no candidate run', 0)} instance types without a candidate run")
+    
+    def create_concurrency_dataframe(self):
+        """Create DataFrame of concurrent encoding summaries"""
+        return self.query_section('concurrency_results', [
+            'input_file', 'concurrency', 'makespan', 'aggregate_fps', 'throughput_gain',
+            'avg_job_slowdown', 'max_job_slowdown'
+        ])
+    
+    def create_chunked_dataframe(self):
+        """Create DataFrame of chunked segment-parallel encoding results"""
+        return self.query_section('chunked_results', [
+            'input_file', 'test_name', 'chunks', 'workers', 'single_duration', 'chunked_duration', 'encode_makespan',
+            'speedup', 'verified', 'vmaf_delta', 'boundary_vmaf_delta', 'interior_vmaf_delta'
+        ])
+    
+    def create_density_dataframe(self):
+        """Create DataFrame of live channel density search results"""
+        df = self.query_section('density_results', ['input_file', 'test', 'pinned', 'max_channels'])
+        if not df.empty:
+            df['price_per_hour'] = df['instance_type'].map(self.price_per_hour)
+            df['channels_per_dollar'] = df['max_channels'] / df['price_per_hour']
+        return df
+    
+    def create_batch_dataframe(self):
+        """Files per second of each small-file batch mode, with the spawn overhead per file.
+        
+        Spawn overhead is the time per file that one process per file costs
+        over batched invocations on the same files, i.e. process start-up,
+        probing and encoder initialisation that batching amortises.
+        """
+        df = self.query_section('batch_results', ['task', 'mode', 'files', 'workers', 'batch_size', 'wall_seconds',
+                                                  'files_per_second', 'seconds_per_file', 'startup_seconds'])
+        if df.empty:
+            return df
+        df = df.dropna(subset=['files_per_second'])
+        if df.empty:
+            return df
+        batch = df.groupby(['instance_type', 'task', 'files', 'mode']).agg({
+            'files_per_second': 'median',
+            'seconds_per_file': 'median',
+            'workers': 'max',
+            'startup_seconds': 'median'
+        }).reset_index()
+        per_file = batch[batch['mode'] == 'per_file'].set_index(['instance_type', 'task', 'files'])['seconds_per_file']
+        batched = batch[batch['mode'] == 'batched'].set_index(['instance_type', 'task', 'files'])['seconds_per_file']
+        overhead = (per_file - batched).rename('spawn_overhead_per_file').reset_index()
+        return batch.merge(overhead, on=['instance_type', 'task', 'files'], how='left')
+    
+    def split_test_names(self, df):
+        """Add the input name and the settings-only test spec (the test name without its input suffix)"""
+        inputs = []
+        for input_file, clip, command in zip(df['input_file'], df['content_clip'], df['command']):
+            if isinstance(input_file, str):
+                inputs.append(os.path.splitext(os.path.basename(input_file))[0])
+            elif isinstance(clip, str):
+                inputs.append(clip)
+            else:
+                # Results from before input_file was recorded: take the input from the command
+                args = command.split() if isinstance(command, str) else []
+                source = args[args.index('-i') + 1] if '-i' in args else ''
+                name = os.path.splitext(os.path.basename(source))[0]
+                # Decode cache entries are named <input>_<digest>.y4m
+                inputs.append(re.sub(r'_[0-9a-f]{12}$', '', name) if source.endswith('.y4m') else name)
+        df = df.assign(input=inputs)
+        df['test_spec'] = [name[:-len(input_name) - 1] if input_name and name.endswith(f"_{input_name}") else name
+                           for name, input_name in zip(df['test_name'], df['input'])]
+        return df
+    
+    def create_cost_dataframe(self, df):
+        """Cost efficiency of every instance type and test, with the Pareto-optimal combinations marked.
+        
+        Cost per encoded hour is the instance price divided by the real-time
+        factor; VMAF points per dollar is the VMAF score divided by that cost.
+        The frontier is taken separately for each input over every instance
+        type and encoder setting, so settings compete as well as instances.
+        """
+        cost = self.split_test_names(df).groupby(['instance_type', 'input', 'test_spec', 'test_name']).agg({
+            'fps': 'median',
+            'real_time_factor': 'median',
+            'vmaf_score': 'median'
+        }).reset_index()
+        cost['price_per_hour'] = cost['instance_type'].map(self.price_per_hour)
+        cost = cost.dropna(subset=['price_per_hour', 'fps', 'real_time_factor'])
+        if cost.empty:
+            return cost
+        
+        cost['cost_per_encoded_hour'] = cost['price_per_hour'] / cost['real_time_factor']
+        cost['frames_per_dollar'] = cost['fps'] * 3600 / cost['price_per_hour']
+        cost['vmaf_per_dollar'] = cost['vmaf_score'] / cost['cost_per_encoded_hour']
+        
+        # Trade off throughput, quality and cost; inputs without VMAF for every result only throughput and cost
+        frontiers = []
+        for _, group in cost.groupby('input'):
+            objectives = ['fps', 'vmaf_score'] if group['vmaf_score'].notna().all() else ['fps']
+            frontiers.append(pareto_frontier(group, maximize=objectives, minimize=['cost_per_encoded_hour']))
+        cost['pareto_optimal'] = pd.concat(frontiers)
+        return cost
+    
+    def create_scaling_dataframe(self, df):
+        """Speedup, parallel efficiency and Amdahl fit for each scaling sweep curve"""
+        sweep = df[df['sweep'] == True]
+        if sweep.empty:
+            return pd.DataFrame()
+        
         rows = []
+        keys = ['instance_type', 'codec', 'preset', 'frame_threads']
+        for key, curve in sweep.groupby(keys, dropna=False):
+            medians = curve.groupby('threads')['duration'].median()
+            if 1 not in medians.index:
+                continue
+            speedups = medians[1] / medians
+            parallel_fraction = fit_amdahl(speedups.index.values, speedups.values)
+            for threads, speedup in speedups.items():
+                rows.append(dict(zip(keys, key), threads=threads, duration=medians[threads], speedup=speedup,
+                                 efficiency=speedup / threads, parallel_fraction=parallel_fraction))
         
-        for arch, data in self.results.items():
-            system_info = data['system_info']
-            for result in data['benchmark_results']:
-                if result.get('success', False):
-                    # Use instance_type if available, otherwise use architecture
-                    instance_type = data['system_info'].get('instance_type', arch)
-                    rows.append({
-                        'instance_type': instance_type,
-                        'cpu_count': system_info['cpu_count'],
-                        'memory_total_gb': system_info['memory_total'] / (1024**3),
-                        'test_name': result['test_name'],
-                        'duration': result['duration'],
-                        'avg_cpu_usage': result['avg_cpu_usage'],
-                        'max_cpu_usage': result['max_cpu_usage'],
-                        'avg_memory_usage': result['avg_memory_usage'],
-                        'output_file_size_mb': result['output_file_size'] / (1024**2),
-                        'fps': self.calculate_fps(result),
-                        'real_time_factor': result.get('real_time_factor'),
-                        'vmaf_score': result.get('vmaf_score')
-                    })
+        return pd.DataFrame(rows)
+    
+    def create_io_dataframe(self, df):
+        """Storage I/O per test and output sink, with the storage-bound share of each result.
         
+        The storage-bound share is I/O wait (summed over cores) as a fraction
+        of wall time, capped at 1. Where a null-sink run of the same test
+        exists, sink overhead is the extra wall time over it.
+        """
+        io = df.groupby(['instance_type', 'test_name', 'output_sink']).agg({
+            'duration': 'median',
+            'read_bytes': 'median',
+            'write_bytes': 'median',
+            'iowait_seconds': 'median'
+        }).reset_index()
+        io = io.dropna(subset=['iowait_seconds'])
+        if io.empty:
+            return io
+        
+        io['storage_bound_share'] = (io['iowait_seconds'] / io['duration']).clip(upper=1.0)
+        null = io[io['output_sink'] == 'null'].set_index(['instance_type', 'test_name'])['duration']
+        io['sink_overhead'] = [
+            row['duration'] / null[(row['instance_type'], row['test_name'])] - 1
+            if (row['instance_type'], row['test_name']) in null.index else np.nan
+            for _, row in io.iterrows()
+        ]
+        return io
+    
+    def create_quality_search_dataframe(self, df):
+        """Encode time and cost at the setting each quality search converged on"""
+        qs = df[df['quality_search'] == True]
+        if qs.empty:
+            return pd.DataFrame()
+        qs = qs.groupby(['instance_type', 'test_name', 'codec', 'rate_control', 'rate_value', 'target_vmaf']).agg({
+            'duration': 'median',
+            'vmaf_score': 'median',
+            'video_duration': 'median',
+            'real_time_factor': 'median'
+        }).reset_index()
+        qs['seconds_per_video_minute'] = qs['duration'] / qs['video_duration'] * 60
+        qs['cost_per_encoded_hour'] = qs['instance_type'].map(self.price_per_hour) / qs['real_time_factor']
+        return qs
+    
+    def create_isa_dataframe(self, df):
+        """Speedup of each ISA level over plain C, and of the unrestricted (native) build, per test"""
+        isa = df[df['isa_ablation'] == True]
+        if isa.empty:
+            return pd.DataFrame()
+        native = df[(df['isa_ablation'] != True) & (df['sweep'] != True)]
+        native = native.groupby(['instance_type', 'test_name'])['duration'].median()
+        
+        rows = []
+        for (instance_type, base_test), group in isa.groupby(['instance_type', 'base_test']):
+            medians = group.groupby('isa_level')['duration'].median()
+            if (instance_type, base_test) in native.index:
+                medians['native'] = native[(instance_type, base_test)]
+            if 'c' not in medians.index:
+                continue
+            for level, duration in medians.items():
+                rows.append({'instance_type': instance_type, 'test_name': base_test, 'isa_level': level,
+                             'duration': duration, 'speedup': medians['c'] / duration})
         return pd.DataFrame(rows)
     
-    def calculate_fps(self, result):
-        """Calculate frames per second (estimate based on duration)"""
-        # Assume 30 fps input for calculation
-        if result['duration'] > 0:
-            return 30 / result['duration']
-        return 0
+    def load_frame_latencies(self):
+        """Per-frame latencies of every low-latency test, pooled across runs per instance type and test"""
+        if 'frame_latencies' not in self.store.table_columns('results'):
+            return {}
+        rows = self.store.query(
+            'SELECT runs.instance_type, r.test_name, r.frame_latencies FROM results r JOIN runs USING (run_id) '
+            'WHERE r.success = 1 AND r.latency = 1 AND r.frame_latencies IS NOT NULL'
+        )
+        pooled = {}
+        for _, row in rows.iterrows():
+            pooled.setdefault((row['instance_type'], row['test_name']), []).extend(json.loads(row['frame_latencies']))
+        return {key: np.array(values) for key, values in pooled.items() if values}
+    
+    def create_latency_dataframe(self, df):
+        """Latency tails of the low-latency tests; percentiles pool the frames of all runs"""
+        latency = df[df['latency'] == True]
+        if latency.empty:
+            return pd.DataFrame()
+        pooled = self.load_frame_latencies()
+        
+        rows = []
+        for (instance_type, test_name), group in latency.groupby(['instance_type', 'test_name']):
+            frames = pooled.get((instance_type, test_name))
+            if frames is None:
+                continue
+            rows.append({
+                'instance_type': instance_type,
+                'test_name': test_name,
+                'runs': len(group),
+                'frames': len(frames),
+                'time_to_first_packet': group['time_to_first_packet'].median(),
+                'p50': np.percentile(frames, 50),
+                'p99': np.percentile(frames, 99),
+                'p999': np.percentile(frames, 99.9),
+                'max': frames.max(),
+                'jitter': group['jitter'].median(),
+                'over_budget': group['frames_over_budget'].sum() / len(frames)
+            })
+        return pd.DataFrame(rows)
+    
+    def create_complexity_dataframe(self, df):
+        """Median FPS per test, resolution and content complexity tier of corpus clips, relative to the low tier"""
+        content = df[df['content_tier'].notna()]
+        if content.empty:
+            return pd.DataFrame()
+        # Test names end with the clip name; strip it to group the same test across clips
+        content = self.split_test_names(content)
+        keys = ['instance_type', 'test_spec', 'content_resolution', 'content_fps']
+        grouped = content.groupby(keys + ['content_tier']).agg(
+            fps=('fps', 'median'),
+            real_time_factor=('real_time_factor', 'median'),
+            clips=('content_clip', 'nunique')
+        ).reset_index()
+        low = grouped[grouped['content_tier'] == 'low'][keys + ['fps']].rename(columns={'fps': 'low_fps'})
+        grouped = grouped.merge(low, on=keys, how='left')
+        grouped['relative_fps'] = grouped['fps'] / grouped['low_fps']
+        return grouped
+    
+    def calculate_fps(self, df):
+        """Calculate frames per second from the measured frame count"""
+        # Older results without progress data: derive frames from output duration and frame rate
+        estimated = df['video_duration'] * df['input_fps'] / df['duration'].where(df['duration'] > 0)
+        return df['avg_fps'].where(df['avg_fps'] > 0, estimated)
     
     def generate_performance_report(self):
         """Generate comprehensive performance comparison report"""
@@ -66,6 +713,16 @@ class BenchmarkAnalyzer:
             print("No data available for analysis")
             return
         
+        # ISA ablation and scaling sweep cells are reported separately from the standard test matrix
+        isa_df = self.create_isa_dataframe(df)
+        latency_df = self.create_latency_dataframe(df)
+        df = df[(df['isa_ablation'] != True) & (df['latency'] != True)]
+        scaling_df = self.create_scaling_dataframe(df)
+        cost_df = self.create_cost_dataframe(df)
+        quality_df = self.create_quality_search_dataframe(df)
+        df = df[(df['sweep'] != True) & (df['quality_search'] != True)]
+        complexity_df = self.create_complexity_dataframe(df)
+        
         report = []
         report.append("# FFmpeg Benchmark Analysis Report")
         report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -87,6 +744,12 @@ class BenchmarkAnalyzer:
                 report.append(f"- Average real-time factor: {avg_rtf:.2f}x")
             if not pd.isna(avg_vmaf):
                 report.append(f"- Average VMAF score: {avg_vmaf:.1f}")
+            avg_cpu_per_frame = arch_data['cpu_seconds_per_frame'].mean()
+            if not pd.isna(avg_cpu_per_frame):
+                report.append(f"- Average CPU-seconds per frame: {avg_cpu_per_frame * 1000:.2f} ms")
+            peak_rss = arch_data['peak_rss_mb'].max()
+            if not pd.isna(peak_rss):
+                report.append(f"- Peak ffmpeg RSS: {peak_rss:.0f} MB")
             report.append(f"- Tests completed: {len(arch_data)}")
             report.append("")
         
@@ -104,33 +767,378 @@ class BenchmarkAnalyzer:
                     arch_test_data = test_data[test_data['instance_type'] == instance_type]
                     avg_duration = arch_test_data['duration'].mean()
                     avg_fps = arch_test_data['fps'].mean()
+                    steady_fps = arch_test_data['steady_state_fps'].mean()
                     
-                    report.append(f"- {instance_type}: {avg_duration:.2f}s avg, {avg_fps:.2f} fps")
+                    steady_str = f", {steady_fps:.2f} fps steady-state" if not pd.isna(steady_fps) else ""
+                    report.append(f"- {instance_type}: {avg_duration:.2f}s avg, {avg_fps:.2f} fps{steady_str}")
                 
                 report.append("")
         
-        # Performance ratios
-        if len(df['instance_type'].unique()) >= 2:
-            instance_types = list(df['instance_type'].unique())
-            arch1, arch2 = instance_types[0], instance_types[1]
+        # Content complexity breakdown
+        if not complexity_df.empty:
+            report.append("## Throughput by Content Complexity")
+            report.append("")
+            report.append("Median FPS on synthetic corpus clips (low: testsrc2, medium: mandelbrot, high: testsrc2 with "
+                          "temporal noise), with the share of the low-tier FPS in parentheses.")
+            report.append("")
+            instance_types = sorted(complexity_df['instance_type'].unique())
+            report.append("| Test | Resolution | Frame Rate | Tier | " + " | ".join(instance_types) + " |")
+            report.append("|------|------------|------------|------|" + "---|" * len(instance_types))
+            
+            tier_rank = lambda tier: COMPLEXITY_TIER_ORDER.index(tier) if tier in COMPLEXITY_TIER_ORDER else len(COMPLEXITY_TIER_ORDER)
+            cells_df = complexity_df.assign(tier_rank=complexity_df['content_tier'].map(tier_rank))
+            for key, group in cells_df.groupby(['test_spec', 'content_resolution', 'content_fps', 'tier_rank', 'content_tier']):
+                test_spec, resolution, frame_rate, _, tier = key
+                cells = []
+                for instance_type in instance_types:
+                    point = group[group['instance_type'] == instance_type]
+                    if point.empty:
+                        cells.append("")
+                        continue
+                    relative = point['relative_fps'].iloc[0]
+                    relative_str = f" ({relative:.0%})" if not pd.isna(relative) and tier != 'low' else ""
+                    cells.append(f"{point['fps'].iloc[0]:.1f}{relative_str}")
+                report.append(f"| {test_spec} | {resolution} | {frame_rate:g} | {tier} | " + " | ".join(cells) + " |")
+            
+            report.append("")
+            sensitivity = complexity_df[complexity_df['content_tier'] != 'low'].dropna(subset=['relative_fps'])
+            if not sensitivity.empty:
+                report.append("### Complexity Sensitivity")
+                medians = sensitivity.groupby(['instance_type', 'content_tier'])['relative_fps'].median()
+                for (instance_type, tier), relative in sorted(medians.items(), key=lambda item: (item[0][0], tier_rank(item[0][1]))):
+                    report.append(f"- {instance_type}: {tier}-complexity content encodes at {relative:.0%} of low-tier FPS "
+                                  f"(median across tests)")
+                report.append("")
+        
+        # Repetition statistics
+        if df.groupby(['instance_type', 'test_name']).size().max() > 1:
+            report.append("## Test Statistics")
+            report.append("")
+            report.append(f"Durations after outlier rejection (only with {OUTLIER_MIN_SAMPLES} or more runs); CI is the "
+                          f"{CONFIDENCE_LEVEL:.0%} bootstrap interval of the median.")
+            report.append("")
+            report.append("| Instance Type | Test | Runs | Outliers | Median (s) | Std Dev (s) | CV | CI |")
+            report.append("|---------------|------|------|----------|------------|-------------|----|----|")
+            
+            for (instance_type, test), group in df.groupby(['instance_type', 'test_name']):
+                stats = summarize_samples(group['duration'])
+                if stats is None:
+                    continue
+                ci = f"{stats['ci_low']:.2f}-{stats['ci_high']:.2f}" if not np.isnan(stats['ci_low']) else "N/A"
+                cv = f"{stats['cv']:.1%}" if not np.isnan(stats['cv']) else "N/A"
+                report.append(f"| {instance_type} | {test} | {stats['n']} | {stats['outliers']} | {stats['median']:.2f} | "
+                              f"{stats['std']:.2f} | {cv} | {ci} |")
             
+            report.append("")
+        
+        # Performance ratios between every pair of instance types
+        instance_types = sorted(df['instance_type'].unique())
+        if len(instance_types) >= 2:
             report.append("## Performance Ratios")
+            report.append("")
+            report.append("Each cell is the speedup of the row instance type over the column: the ratio of median durations of "
+                          "each test (input and settings), combined over tests as a geometric mean. "
+                          f"`*` marks ratios whose {CONFIDENCE_LEVEL:.0%} bootstrap CI excludes 1.0; single-run results are never significant.")
+            report.append("")
             
             for test_type in test_types:
                 test_data = df[df['test_name'].str.contains(test_type)]
-                if not test_data.empty:
-                    arch1_avg = test_data[test_data['instance_type'] == arch1]['duration'].mean()
-                    arch2_avg = test_data[test_data['instance_type'] == arch2]['duration'].mean()
-                    
-                    if arch1_avg > 0 and arch2_avg > 0:
-                        ratio = arch1_avg / arch2_avg
-                        faster_arch = arch1 if ratio > 1 else arch2
-                        ratio = max(ratio, 1/ratio)
-                        
-                        report.append(f"- {test_type}: {faster_arch} is {ratio:.2f}x faster")
+                samples = {}
+                for (instance_type, test_name), group in test_data.groupby(['instance_type', 'test_name']):
+                    stats = summarize_samples(group['duration'])
+                    if stats is not None:
+                        samples.setdefault(instance_type, {})[test_name] = stats['values']
+                if len(samples) < 2:
+                    continue
+                
+                names = sorted(samples)
+                report.append(f"### {test_type.upper()}")
+                report.append("| | " + " | ".join(names) + " |")
+                report.append("|---|" + "---|" * len(names))
+                for row in names:
+                    cells = []
+                    for col in names:
+                        if row == col:
+                            cells.append("-")
+                            continue
+                        common = sorted(set(samples[row]) & set(samples[col]))
+                        if not common:
+                            cells.append("N/A")
+                            continue
+                        ratio, _, _, significant = compare_matched_samples(
+                            [(samples[col][test_name], samples[row][test_name]) for test_name in common])
+                        cells.append(f"{ratio:.2f}x{'*' if significant else ''}")
+                    report.append(f"| {row} | " + " | ".join(cells) + " |")
+                report.append("")
+        
+        # Decode / scale / encode breakdown for runs using the decode cache
+        cached = df[df['decode_cache'] == True]
+        if not cached.empty:
+            report.append("## Pipeline Cost Breakdown")
+            report.append("")
+            report.append("Decode and scale run once per input and are shared by every test; encode is timed on cached raw frames.")
+            report.append("")
+            report.append("| Instance Type | Test | Decode (s) | Scale (s) | Encode (s) | Encode FPS |")
+            report.append("|---------------|------|------------|-----------|------------|------------|")
+            
+            breakdown = cached.groupby(['instance_type', 'test_name']).agg({
+                'decode_seconds': 'mean',
+                'scale_seconds': 'mean',
+                'duration': 'mean',
+                'fps': 'mean'
+            })
+            for (instance_type, test), row in breakdown.iterrows():
+                fps = f"{row['fps']:.1f}" if not pd.isna(row['fps']) else "N/A"
+                report.append(f"| {instance_type} | {test} | {row['decode_seconds']:.2f} | {row['scale_seconds']:.2f} | {row['duration']:.2f} | {fps} |")
+            
+            report.append("")
+        
+        # Concurrent encoding results
+        concurrency_df = self.create_concurrency_dataframe()
+        if not concurrency_df.empty:
+            report.append("## Concurrent Encoding")
+            report.append("")
+            report.append("| Instance Type | Input | Concurrency | Makespan (s) | Aggregate FPS | Throughput Gain | Avg Job Slowdown |")
+            report.append("|---------------|-------|-------------|--------------|---------------|-----------------|------------------|")
+            
+            for _, row in concurrency_df.sort_values(['instance_type', 'input_file', 'concurrency']).iterrows():
+                fps = f"{row['aggregate_fps']:.1f}" if not pd.isna(row['aggregate_fps']) else "N/A"
+                gain = f"{row['throughput_gain']:.2f}x" if not pd.isna(row['throughput_gain']) else "N/A"
+                slowdown = f"{row['avg_job_slowdown']:.2f}x" if not pd.isna(row['avg_job_slowdown']) else "N/A"
+                report.append(f"| {row['instance_type']} | {os.path.basename(row['input_file'])} | {row['concurrency']} | {row['makespan']:.2f} | {fps} | {gain} | {slowdown} |")
+            
+            report.append("")
+        
+        # Chunked segment-parallel encoding
+        chunked_df = self.create_chunked_dataframe()
+        if not chunked_df.empty:
+            report.append("## Chunked Encoding")
+            report.append("")
+            report.append("Each test split at keyframes, chunks encoded on a worker pool and joined with the concat demuxer. "
+                          "Speedup is against the single-process encode and includes splitting and joining. VMAF deltas are "
+                          "chunked minus single-process scores, near chunk boundaries and elsewhere.")
+            report.append("")
+            report.append("| Instance Type | Test | Chunks | Workers | Single (s) | Chunked (s) | Speedup | Verified | VMAF Δ | Boundary VMAF Δ | Interior VMAF Δ |")
+            report.append("|---------------|------|--------|---------|------------|-------------|---------|----------|--------|-----------------|-----------------|")
+            
+            def delta(value):
+                return f"{value:+.2f}" if not pd.isna(value) else "N/A"
+            
+            for _, row in chunked_df.sort_values(['instance_type', 'test_name']).iterrows():
+                single = f"{row['single_duration']:.2f}" if not pd.isna(row['single_duration']) else "N/A"
+                speedup = f"{row['speedup']:.2f}x" if not pd.isna(row['speedup']) else "N/A"
+                report.append(f"| {row['instance_type']} | {row['test_name']} | {row['chunks']} | {row['workers']} | {single} | "
+                              f"{row['chunked_duration']:.2f} | {speedup} | {'yes' if row['verified'] else 'NO'} | "
+                              f"{delta(row['vmaf_delta'])} | {delta(row['boundary_vmaf_delta'])} | {delta(row['interior_vmaf_delta'])} |")
+            
+            report.append("")
+        
+        # Storage I/O
+        io_df = self.create_io_dataframe(df)
+        if not io_df.empty:
+            report.append("## Storage I/O")
+            report.append("")
+            report.append("Block I/O of the ffmpeg process and machine-wide I/O wait per output sink. Storage-bound share is "
+                          "I/O wait as a fraction of wall time; sink overhead is the extra wall time over the null muxer.")
+            report.append("")
+            report.append("| Instance Type | Test | Sink | Duration (s) | Read (MB) | Written (MB) | I/O Wait (s) | Storage-Bound | Sink Overhead |")
+            report.append("|---------------|------|------|--------------|-----------|--------------|--------------|---------------|---------------|")
+            
+            for _, row in io_df.sort_values(['instance_type', 'test_name', 'output_sink']).iterrows():
+                overhead = f"{row['sink_overhead']:+.1%}" if not pd.isna(row['sink_overhead']) else "N/A"
+                report.append(f"| {row['instance_type']} | {row['test_name']} | {row['output_sink']} | {row['duration']:.2f} | "
+                              f"{row['read_bytes'] / 1024**2:.1f} | {row['write_bytes'] / 1024**2:.1f} | "
+                              f"{row['iowait_seconds']:.2f} | {row['storage_bound_share']:.1%} | {overhead} |")
             
             report.append("")
         
+        # Cost efficiency and Pareto frontier
+        missing = sorted(t for t in df['instance_type'].unique() if pd.isna(self.price_per_hour(t)))
+        if missing:
+            print(f"No {self.pricing} price for: {', '.join(missing)} (add them with --prices)")
+        if not cost_df.empty:
+            report.append("## Cost Efficiency")
+            report.append("")
+            report.append(f"Prices: {self.pricing.replace('_', '-')} USD per hour. Cost per encoded hour is the cost of encoding "
+                          "one hour of video; VMAF points per dollar is the VMAF score divided by that cost. "
+                          "`*` marks instance type and test combinations on the Pareto frontier of throughput, quality "
+                          "and cost for the same input.")
+            report.append("")
+            report.append("| Instance Type | Input | Test | Price ($/h) | Cost per Encoded Hour ($) | Frames per $ | VMAF Points per $ | Pareto |")
+            report.append("|---------------|-------|------|-------------|---------------------------|--------------|-------------------|--------|")
+            
+            for _, row in cost_df.sort_values(['input', 'test_spec', 'cost_per_encoded_hour']).iterrows():
+                vmaf_per_dollar = f"{row['vmaf_per_dollar']:.0f}" if not pd.isna(row['vmaf_per_dollar']) else "N/A"
+                report.append(f"| {row['instance_type']} | {row['input']} | {row['test_spec']} | {row['price_per_hour']:.4f} | "
+                              f"{row['cost_per_encoded_hour']:.4f} | {row['frames_per_dollar']:,.0f} | {vmaf_per_dollar} | "
+                              f"{'*' if row['pareto_optimal'] else ''} |")
+            
+            report.append("")
+            report.append("### Optimal Instance Types and Settings")
+            for input_name, group in cost_df[cost_df['pareto_optimal']].groupby('input'):
+                optimal = []
+                for _, row in group.sort_values('cost_per_encoded_hour').iterrows():
+                    vmaf = f", VMAF {row['vmaf_score']:.1f}" if not pd.isna(row['vmaf_score']) else ""
+                    optimal.append(f"{row['instance_type']} {row['test_spec']} ({row['fps']:.1f} fps{vmaf}, "
+                                   f"${row['cost_per_encoded_hour']:.4f} per encoded hour)")
+                report.append(f"- {input_name}: " + "; ".join(optimal))
+            report.append("")
+        
+        # Live channel density
+        density_df = self.create_density_dataframe()
+        if not density_df.empty:
+            report.append("## Live Channel Density")
+            report.append("")
+            report.append("Maximum concurrent real-time channels (every stream at or above the speed threshold with no dropped frames). "
+                          f"Channels per dollar is channels divided by the hourly {self.pricing.replace('_', '-')} price.")
+            report.append("")
+            report.append("| Instance Type | Input | Rendition | Pinned | Channels | Price ($/h) | Channels per $ |")
+            report.append("|---------------|-------|-----------|--------|----------|-------------|----------------|")
+            
+            for _, row in density_df.sort_values(['instance_type', 'input_file']).iterrows():
+                price = f"{row['price_per_hour']:.4f}" if not pd.isna(row['price_per_hour']) else "N/A"
+                per_dollar = f"{row['channels_per_dollar']:.1f}" if not pd.isna(row['channels_per_dollar']) else "N/A"
+                report.append(f"| {row['instance_type']} | {os.path.basename(row['input_file'])} | {row['test']} | "
+                              f"{'yes' if row['pinned'] else 'no'} | {row['max_channels']} | {price} | {per_dollar} |")
+            
+            report.append("")
+        
+        # Small-file batch throughput
+        batch_df = self.create_batch_dataframe()
+        if not batch_df.empty:
+            modes = [m for m in ('per_file', 'batched', 'pool', 'pool_batched') if m in set(batch_df['mode'])]
+            report.append("## Small-File Batch Throughput")
+            report.append("")
+            report.append("Files per second on short clips with one ffmpeg process per file, many inputs and outputs per "
+                          "process (batched), and the same two on a pre-forked worker pool. Spawn overhead is the time per "
+                          "file that one process per file costs over batched invocations.")
+            report.append("")
+            report.append("| Instance Type | Task | Files | " + " | ".join(f"{m.replace('_', ' ')} (files/s)" for m in modes) +
+                          " | Spawn Overhead per File (ms) |")
+            report.append("|---------------|------|-------|" + "---|" * len(modes) + "------------------------------|")
+            
+            for (instance_type, task, files), group in batch_df.groupby(['instance_type', 'task', 'files']):
+                rates = group.set_index('mode')['files_per_second']
+                cells = [f"{rates[m]:.1f}" if m in rates.index else "" for m in modes]
+                overhead = group['spawn_overhead_per_file'].iloc[0]
+                overhead = f"{overhead * 1000:.1f}" if not pd.isna(overhead) else "N/A"
+                report.append(f"| {instance_type} | {task} | {int(files)} | " + " | ".join(cells) + f" | {overhead} |")
+            
+            report.append("")
+            for instance_type, group in batch_df.groupby('instance_type'):
+                startup = group['startup_seconds'].median()
+                overhead = group['spawn_overhead_per_file'].median()
+                overhead_str = f", spawn overhead {overhead * 1000:.1f} ms per file (median across tasks)" if not pd.isna(overhead) else ""
+                report.append(f"- {instance_type}: ffmpeg start-up {startup * 1000:.1f} ms{overhead_str}")
+            report.append("")
+        
+        # Time to target quality
+        if not quality_df.empty:
+            report.append("## Time to Target Quality")
+            report.append("")
+            report.append("Encode time at the cheapest CRF or bitrate that reached the target VMAF on sampled segments of each "
+                          "input, so instance types are compared at equal quality. VMAF is measured on the full encode.")
+            report.append("")
+            report.append("| Instance Type | Test | Target VMAF | Setting | VMAF | Encode (s) | Seconds per Video Minute | Cost per Encoded Hour ($) |")
+            report.append("|---------------|------|-------------|---------|------|------------|--------------------------|---------------------------|")
+            
+            for _, row in quality_df.sort_values(['test_name', 'target_vmaf', 'seconds_per_video_minute']).iterrows():
+                setting = f"crf {row['rate_value']:.0f}" if row['rate_control'] == 'crf' else f"{row['rate_value']:.0f} kbit/s"
+                vmaf = f"{row['vmaf_score']:.1f}" if not pd.isna(row['vmaf_score']) else "N/A"
+                cost = f"{row['cost_per_encoded_hour']:.4f}" if not pd.isna(row['cost_per_encoded_hour']) else "N/A"
+                report.append(f"| {row['instance_type']} | {row['test_name']} | {row['target_vmaf']:g} | {setting} | {vmaf} | "
+                              f"{row['duration']:.2f} | {row['seconds_per_video_minute']:.1f} | {cost} |")
+            
+            report.append("")
+        
+        # ISA ablation
+        if not isa_df.empty:
+            report.append("## ISA Ablation")
+            report.append("")
+            report.append("Speedup over plain C (all ffmpeg, x264 and x265 assembly disabled) with SIMD limited to each "
+                          "instruction set level; native is the unrestricted run. A small native speedup points at "
+                          "missing hand-written assembly rather than slow hardware.")
+            report.append("")
+            levels = sorted(isa_df['isa_level'].unique(),
+                            key=lambda level: ISA_LEVEL_ORDER.index(level) if level in ISA_LEVEL_ORDER else len(ISA_LEVEL_ORDER) - 1)
+            report.append("| Instance Type | Test | C (s) | " + " | ".join(levels[1:]) + " |")
+            report.append("|---------------|------|-------|" + "---|" * (len(levels) - 1))
+            
+            for (instance_type, test_name), group in isa_df.groupby(['instance_type', 'test_name']):
+                speedups = group.set_index('isa_level')['speedup']
+                c_duration = group.loc[group['isa_level'] == 'c', 'duration'].iloc[0]
+                cells = [f"{speedups[level]:.2f}x" if level in speedups.index else "" for level in levels[1:]]
+                report.append(f"| {instance_type} | {test_name} | {c_duration:.2f} | " + " | ".join(cells) + " |")
+            
+            report.append("")
+            native = isa_df[isa_df['isa_level'] == 'native']
+            if not native.empty:
+                report.append("### Assembly Contribution")
+                for instance_type, speedup in native.groupby('instance_type')['speedup'].median().items():
+                    report.append(f"- {instance_type}: native build is {speedup:.2f}x faster than plain C (median across tests)")
+                report.append("")
+        
+        # Low-latency live encoding
+        if not latency_df.empty:
+            report.append("## Live Latency")
+            report.append("")
+            report.append("Zero-latency encodes without B-frames and with a one-frame VBV buffer, fed raw frames over a pipe "
+                          "at a fixed frame rate. Frame latency runs from when a frame is due until its last byte arrives on "
+                          "the output pipe. Percentiles pool the frames of all runs. Jitter is the mean change in latency between "
+                          "consecutive frames, and over budget counts frames slower than one frame interval.")
+            report.append("")
+            report.append("| Instance Type | Test | Runs | Frames | First Packet (ms) | p50 (ms) | p99 (ms) | p99.9 (ms) | Max (ms) | Jitter (ms) | Over Budget |")
+            report.append("|---------------|------|------|--------|-------------------|----------|----------|------------|----------|-------------|-------------|")
+            
+            for _, row in latency_df.sort_values(['test_name', 'instance_type']).iterrows():
+                report.append(f"| {row['instance_type']} | {row['test_name']} | {row['runs']} | {row['frames']} | "
+                              f"{row['time_to_first_packet'] * 1000:.1f} | {row['p50'] * 1000:.1f} | {row['p99'] * 1000:.1f} | "
+                              f"{row['p999'] * 1000:.1f} | {row['max'] * 1000:.1f} | {row['jitter'] * 1000:.2f} | "
+                              f"{row['over_budget']:.1%} |")
+            
+            report.append("")
+            tails = latency_df.groupby('test_name').filter(lambda group: len(group) > 1)
+            if not tails.empty:
+                report.append("### Latency Tail Comparison")
+                for test_name, group in tails.groupby('test_name'):
+                    best = group.loc[group['p99'].idxmin()]
+                    others = ", ".join(f"{row['instance_type']} {row['p99'] / best['p99']:.2f}x"
+                                       for _, row in group.sort_values('p99').iterrows()
+                                       if row['instance_type'] != best['instance_type'])
+                    report.append(f"- {test_name}: lowest p99 on {best['instance_type']} ({best['p99'] * 1000:.1f} ms); {others}")
+                report.append("")
+        
+        # Thread scaling sweep
+        if not scaling_df.empty:
+            report.append("## Thread Scaling")
+            report.append("")
+            report.append("Speedup is relative to the 1-thread run of the same codec and preset, pinned to as many cores as threads. "
+                          "Parallel fraction and maximum speedup come from an Amdahl's law fit.")
+            report.append("")
+            report.append("| Instance Type | Codec | Preset | Frame Threads | Parallel Fraction | Max Speedup | " +
+                          " | ".join(f"{int(n)} threads" for n in sorted(scaling_df['threads'].unique())) + " |")
+            report.append("|---------------|-------|--------|---------------|-------------------|-------------|" +
+                          "---|" * len(scaling_df['threads'].unique()))
+            
+            for key, curve in scaling_df.groupby(['instance_type', 'codec', 'preset', 'frame_threads'], dropna=False):
+                instance_type, codec, preset, frame_threads = key
+                parallel_fraction = curve['parallel_fraction'].iloc[0]
+                max_speedup = 1 / (1 - parallel_fraction) if parallel_fraction < 1 else float('inf')
+                cells = []
+                for n in sorted(scaling_df['threads'].unique()):
+                    point = curve[curve['threads'] == n]
+                    if point.empty:
+                        cells.append("")
+                    else:
+                        cells.append(f"{point['speedup'].iloc[0]:.2f}x ({point['efficiency'].iloc[0]:.0%})")
+                frame_threads = "default" if pd.isna(frame_threads) else int(frame_threads)
+                report.append(f"| {instance_type} | {codec} | {preset} | {frame_threads} | {parallel_fraction:.3f} | "
+                              f"{max_speedup:.1f}x | " + " | ".join(cells) + " |")
+            
+            report.append("")
+            report.append("Cells show speedup (parallel efficiency).")
+            report.append("")
+        
         # Add benchmark results table
         report.append("## Benchmark Results Table")
         report.append("")
@@ -138,19 +1146,25 @@ class BenchmarkAnalyzer:
         # Create summary table
         summary_df = df.groupby(['instance_type', 'test_name']).agg({
             'avg_cpu_usage': 'mean',
+            'cpu_seconds_per_frame': 'mean',
+            'fps': 'mean',
+            'steady_state_fps': 'mean',
             'real_time_factor': 'mean',
             'vmaf_score': 'mean'
         }).round(2)
         
         # Convert to markdown table
-        report.append("| Instance Type | Test | Avg CPU (%) | Real-Time Factor | VMAF Score |")
-        report.append("|---------------|------|-------------|------------------|------------|")
+        report.append("| Instance Type | Test | Avg CPU (%) | CPU ms/frame | FPS | Steady-State FPS | Real-Time Factor | VMAF Score |")
+        report.append("|---------------|------|-------------|--------------|-----|------------------|------------------|------------|")
         
         for (arch, test), row in summary_df.iterrows():
             cpu = f"{row['avg_cpu_usage']:.1f}" if not pd.isna(row['avg_cpu_usage']) else "N/A"
+            cpu_per_frame = f"{row['cpu_seconds_per_frame'] * 1000:.2f}" if not pd.isna(row['cpu_seconds_per_frame']) else "N/A"
+            fps = f"{row['fps']:.1f}" if not pd.isna(row['fps']) else "N/A"
+            steady_fps = f"{row['steady_state_fps']:.1f}" if not pd.isna(row['steady_state_fps']) else "N/A"
             rtf = f"{row['real_time_factor']:.2f}x" if not pd.isna(row['real_time_factor']) else "N/A"
             vmaf = f"{row['vmaf_score']:.1f}" if not pd.isna(row['vmaf_score']) else "N/A"
-            report.append(f"| {arch} | {test} | {cpu} | {rtf} | {vmaf} |")
+            report.append(f"| {arch} | {test} | {cpu} | {cpu_per_frame} | {fps} | {steady_fps} | {rtf} | {vmaf} |")
         
         report.append("")
         
@@ -174,6 +1188,12 @@ class BenchmarkAnalyzer:
             print("No data available for visualization")
             return
         
+        latency_df = self.create_latency_dataframe(df)
+        df = df[(df['isa_ablation'] != True) & (df['latency'] != True)]
+        scaling_df = self.create_scaling_dataframe(df)
+        cost_df = self.create_cost_dataframe(df)
+        df = df[(df['sweep'] != True) & (df['quality_search'] != True)]
+        
         # Performance comparison chart
         plt.figure(figsize=(12, 8))
         
@@ -208,16 +1228,171 @@ class BenchmarkAnalyzer:
         plt.tight_layout()
         plt.savefig('ffmpeg_benchmark_comparison.png', dpi=300, bbox_inches='tight')
         print("Visualization saved to: ffmpeg_benchmark_comparison.png")
+        
+        self.create_progress_chart()
+        if not scaling_df.empty:
+            self.create_scaling_chart(scaling_df)
+        if not cost_df.empty:
+            self.create_cost_chart(cost_df)
+        if not latency_df.empty:
+            self.create_latency_chart()
+    
+    def create_latency_chart(self):
+        """Plot the frame latency tail (complementary CDF) of each low-latency test per instance type"""
+        pooled = self.load_frame_latencies()
+        tests = sorted({test_name for _, test_name in pooled})
+        fig, axes = plt.subplots(len(tests), 1, figsize=(10, 4 * len(tests)), squeeze=False)
+        
+        for ax, test_name in zip(axes[:, 0], tests):
+            for (instance_type, name), frames in sorted(pooled.items()):
+                if name != test_name:
+                    continue
+                frames = np.sort(frames) * 1000
+                ax.plot(frames, 1 - np.arange(len(frames)) / len(frames), label=instance_type)
+            ax.set_yscale('log')
+            ax.set_title(f'Frame latency tail: {test_name}')
+            ax.set_xlabel('Frame latency (ms)')
+            ax.set_ylabel('Fraction of frames slower')
+            ax.legend(fontsize='small')
+        
+        fig.tight_layout()
+        fig.savefig('ffmpeg_benchmark_latency.png', dpi=150, bbox_inches='tight')
+        print("Latency chart saved to: ffmpeg_benchmark_latency.png")
+    
+    def create_cost_chart(self, cost_df):
+        """Plot throughput and quality against cost with the Pareto frontier highlighted"""
+        has_vmaf = cost_df['vmaf_score'].notna().any()
+        fig, axes = plt.subplots(1, 2 if has_vmaf else 1, figsize=(16 if has_vmaf else 8, 6), squeeze=False)
+        panels = [('fps', 'Frames per Second')] + ([('vmaf_score', 'VMAF Score')] if has_vmaf else [])
+        
+        for ax, (metric, label) in zip(axes[0], panels):
+            for instance_type, group in cost_df.groupby('instance_type'):
+                ax.scatter(group['cost_per_encoded_hour'], group[metric], label=instance_type, alpha=0.7)
+            frontier = cost_df[cost_df['pareto_optimal']]
+            ax.scatter(frontier['cost_per_encoded_hour'], frontier[metric], facecolors='none', edgecolors='black',
+                       s=150, label='Pareto-optimal')
+            for _, row in frontier.iterrows():
+                ax.annotate(row['test_name'], (row['cost_per_encoded_hour'], row[metric]), fontsize=7,
+                            xytext=(4, 4), textcoords='offset points')
+            ax.set_xlabel(f'Cost per encoded hour (USD, {self.pricing.replace("_", "-")})')
+            ax.set_ylabel(label)
+            ax.set_title(f'{label} vs Cost')
+            ax.legend(fontsize='small')
+        
+        fig.tight_layout()
+        fig.savefig('ffmpeg_benchmark_cost.png', dpi=150, bbox_inches='tight')
+        print("Cost chart saved to: ffmpeg_benchmark_cost.png")
+    
+    def create_scaling_chart(self, scaling_df):
+        """Plot speedup and parallel efficiency curves with their Amdahl fits"""
+        codecs = sorted(scaling_df['codec'].unique())
+        fig, axes = plt.subplots(len(codecs), 2, figsize=(14, 5 * len(codecs)), squeeze=False)
+        
+        for (speedup_ax, efficiency_ax), codec in zip(axes, codecs):
+            codec_df = scaling_df[scaling_df['codec'] == codec]
+            max_threads = codec_df['threads'].max()
+            fit_threads = np.linspace(1, max_threads, 50)
+            
+            for key, curve in codec_df.groupby(['instance_type', 'preset', 'frame_threads'], dropna=False):
+                instance_type, preset, frame_threads = key
+                label = f"{instance_type} {preset}" + ("" if pd.isna(frame_threads) else f" ft={int(frame_threads)}")
+                curve = curve.sort_values('threads')
+                line, = speedup_ax.plot(curve['threads'], curve['speedup'], marker='o', label=label)
+                p = curve['parallel_fraction'].iloc[0]
+                speedup_ax.plot(fit_threads, 1 / ((1 - p) + p / fit_threads), linestyle='--', color=line.get_color(), alpha=0.6)
+                efficiency_ax.plot(curve['threads'], curve['efficiency'] * 100, marker='o', label=label)
+            
+            speedup_ax.plot([1, max_threads], [1, max_threads], color='grey', linestyle=':', label='ideal')
+            speedup_ax.set_title(f'{codec} speedup (dashed: Amdahl fit)')
+            speedup_ax.set_xlabel('Threads / pinned cores')
+            speedup_ax.set_ylabel('Speedup vs 1 thread')
+            speedup_ax.legend(fontsize='small')
+            efficiency_ax.set_title(f'{codec} parallel efficiency')
+            efficiency_ax.set_xlabel('Threads / pinned cores')
+            efficiency_ax.set_ylabel('Efficiency (%)')
+            efficiency_ax.set_ylim(0, 110)
+            efficiency_ax.legend(fontsize='small')
+        
+        fig.tight_layout()
+        fig.savefig('ffmpeg_benchmark_scaling.png', dpi=150, bbox_inches='tight')
+        print("Scaling chart saved to: ffmpeg_benchmark_scaling.png")
+    
+    def create_progress_chart(self):
+        """Plot the measured FPS time-series of every test per instance type"""
+        if 'progress' not in self.store.table_columns('results'):
+            return
+        
+        # Only the latest run of each instance type, so the chart stays readable
+        rows = self.store.query(
+            'SELECT runs.instance_type, r.test_name, r.progress FROM results r JOIN runs USING (run_id) '
+            'WHERE r.success = 1 AND r.progress IS NOT NULL AND runs.run_id IN ('
+            '  SELECT run_id FROM runs latest WHERE latest.timestamp = ('
+            '    SELECT MAX(timestamp) FROM runs other WHERE other.instance_type = latest.instance_type))'
+        )
+        series = {}
+        for _, row in rows.iterrows():
+            samples = [p for p in json.loads(row['progress']) if p.get('fps') is not None]
+            if samples:
+                series.setdefault(row['instance_type'], []).append((row['test_name'], samples))
+        
+        if not series:
+            return
+        
+        fig, axes = plt.subplots(len(series), 1, figsize=(12, 4 * len(series)), squeeze=False)
+        for ax, (instance_type, tests) in zip(axes[:, 0], sorted(series.items())):
+            for test_name, samples in tests:
+                ax.plot([p['t'] for p in samples], [p['fps'] for p in samples], label=test_name)
+            ax.set_title(f'Encoding FPS over time: {instance_type}')
+            ax.set_xlabel('Elapsed (seconds)')
+            ax.set_ylabel('Frames per Second')
+            ax.legend(fontsize='small')
+        
+        fig.tight_layout()
+        fig.savefig('ffmpeg_benchmark_progress.png', dpi=150, bbox_inches='tight')
+        print("Progress chart saved to: ffmpeg_benchmark_progress.png")
 
 def main():
-    analyzer = BenchmarkAnalyzer()
+    parser = argparse.ArgumentParser(description='FFmpeg Benchmark Analyzer')
+    parser.add_argument('--results-dir', default='results', help='Directory with benchmark result files')
+    parser.add_argument('--db', help='Results store path (default: <results-dir>/benchmark_results.db)')
+    parser.add_argument('--ingest-only', action='store_true', help='Only ingest new result files into the store')
+    parser.add_argument('--pricing', choices=['on_demand', 'spot'], default='on_demand', help='Price model for cost analysis')
+    parser.add_argument('--prices', help='JSON file overriding instance prices: {"c8g.xlarge": {"on_demand": 0.16, "spot": 0.06}}')
+    parser.add_argument('--save-baseline', metavar='NAME', help='Save the latest run of each instance type as a named baseline')
+    parser.add_argument('--compare-baseline', metavar='NAME',
+                        help='Compare the latest runs with a named baseline and exit non-zero on regressions')
+    parser.add_argument('--run', action='append', dest='run_ids', metavar='RUN_ID',
+                        help='Run to use as baseline or candidate instead of the latest (repeatable)')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Minimum relative change in encode duration counted as a regression')
+    args = parser.parse_args()
+    
+    analyzer = BenchmarkAnalyzer(args.pricing)
+    if args.prices:
+        analyzer.load_prices(args.prices)
     
     # Load results
-    analyzer.load_results()
+    analyzer.load_results(args.results_dir, args.db)
     
-    if not analyzer.results:
+    if analyzer.runs.empty:
         print("No benchmark results found!")
         sys.exit(1)
+    if args.ingest_only:
+        return
+    
+    if args.save_baseline:
+        if not analyzer.save_baseline(args.save_baseline, args.run_ids):
+            print("No runs to save as baseline!")
+            sys.exit(1)
+        return
+    
+    if args.compare_baseline:
+        comparison = analyzer.compare_to_baseline(args.compare_baseline, args.run_ids, args.threshold)
+        if comparison.empty:
+            print(f"Nothing to compare with baseline '{args.compare_baseline}'!")
+            sys.exit(1)
+        analyzer.print_baseline_comparison(args.compare_baseline, comparison)
+        sys.exit(2 if comparison['status'].isin(GATE_FAILURES).any() else 0)
     
     # Generate report and visualizations
     analyzer.generate_performance_report()
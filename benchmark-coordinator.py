@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+
+import argparse
+import importlib.util
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_script(name, filename):
+    """Import one of the hyphenated sibling scripts as a module"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class WorkQueue:
+    """Test matrix of one benchmark campaign, shared out to workers by group.
+    
+    Every group (normally an instance type) gets its own copy of the matrix
+    so each unit is measured once per group. Units are dealt to workers in
+    small batches; a worker whose own queue runs dry steals half of the
+    longest queue of another worker in the same group. Workers that miss
+    heartbeats are dropped and their units go back to the group pool, and
+    failed or lost units are retried up to max_attempts times.
+    """
+    def __init__(self, units, groups=None, batch_size=2, max_attempts=3, heartbeat_timeout=30):
+        self.template = units
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.heartbeat_timeout = heartbeat_timeout
+        self.lock = threading.Lock()
+        self.units = {}
+        self.pools = {}
+        self.workers = {}
+        self.fixed_groups = bool(groups)
+        for group in groups or []:
+            self.add_group(group)
+    
+    def add_group(self, group):
+        """Copy the matrix into a new group's pool"""
+        self.pools[group] = deque()
+        for template in self.template:
+            unit = dict(template, unit_id=f"{group}/{template['name']}", group=group,
+                        state="pending", attempts=0, worker_id=None, errors=[])
+            self.units[unit["unit_id"]] = unit
+            self.pools[group].append(unit["unit_id"])
+    
+    def register(self, worker_id, group, system_info):
+        with self.lock:
+            if group not in self.pools:
+                if self.fixed_groups:
+                    return False
+                self.add_group(group)
+            self.workers[worker_id] = {"group": group, "queue": deque(), "running": None, "lost": False,
+                                       "last_seen": time.time(), "system_info": system_info, "completed": 0}
+            print(f"Worker {worker_id} joined group {group}")
+            return True
+    
+    def touch(self, worker_id):
+        worker = self.workers.get(worker_id)
+        if worker and not worker["lost"]:
+            worker["last_seen"] = time.time()
+            return worker
+        return None
+    
+    def steal(self, worker_id, group):
+        """Move half of the longest same-group queue to this worker"""
+        peers = [w for wid, w in self.workers.items() if wid != worker_id and w["group"] == group and not w["lost"]]
+        victim = max(peers, key=lambda w: len(w["queue"]), default=None)
+        if not victim or not victim["queue"]:
+            return []
+        # Take from the tail so the victim keeps the units it will run next
+        return [victim["queue"].pop() for _ in range((len(victim["queue"]) + 1) // 2)][::-1]
+    
+    def next_unit(self, worker_id):
+        """Next unit for a worker, or None with a flag saying whether the campaign is finished.
+        
+        The flag is None for workers that are unknown or were dropped, which
+        must register again.
+        """
+        with self.lock:
+            worker = self.touch(worker_id)
+            if not worker:
+                return None, None
+            group = worker["group"]
+            if not worker["queue"]:
+                pool = self.pools[group]
+                batch = [pool.popleft() for _ in range(min(self.batch_size, len(pool)))]
+                if not batch:
+                    batch = self.steal(worker_id, group)
+                    if batch:
+                        print(f"Worker {worker_id} stole {len(batch)} units")
+                worker["queue"].extend(batch)
+            if not worker["queue"]:
+                return None, self.finished()
+            
+            unit = self.units[worker["queue"].popleft()]
+            unit.update(state="running", worker_id=worker_id, attempts=unit["attempts"] + 1, started=time.time())
+            worker["running"] = unit["unit_id"]
+            return unit, False
+    
+    def heartbeat(self, worker_id):
+        with self.lock:
+            return self.touch(worker_id) is not None
+    
+    def complete(self, worker_id, unit_id, success, error=None):
+        """Record a finished unit; returns False if the unit was reassigned in the meantime"""
+        with self.lock:
+            worker = self.touch(worker_id)
+            unit = self.units.get(unit_id)
+            if not worker or not unit or unit["worker_id"] != worker_id or unit["state"] != "running":
+                return False
+            worker["running"] = None
+            if success:
+                unit["state"] = "done"
+                worker["completed"] += 1
+            else:
+                unit["errors"].append(error or "failed")
+                self.retry(unit)
+            return True
+    
+    def retry(self, unit):
+        """Return a failed or lost unit to the front of its group pool unless it is out of attempts"""
+        unit["worker_id"] = None
+        if unit["attempts"] >= self.max_attempts:
+            unit["state"] = "failed"
+            print(f"Unit {unit['unit_id']} failed after {unit['attempts']} attempts: {unit['errors'][-1]}")
+        else:
+            unit["state"] = "pending"
+            self.pools[unit["group"]].appendleft(unit["unit_id"])
+    
+    def reap(self):
+        """Drop workers that missed their heartbeats and requeue their units"""
+        with self.lock:
+            now = time.time()
+            for worker_id, worker in self.workers.items():
+                if worker["lost"] or now - worker["last_seen"] < self.heartbeat_timeout:
+                    continue
+                worker["lost"] = True
+                print(f"Worker {worker_id} lost (no heartbeat for {now - worker['last_seen']:.0f}s)")
+                if worker["running"]:
+                    unit = self.units[worker["running"]]
+                    unit["errors"].append(f"worker {worker_id} lost")
+                    self.retry(unit)
+                    worker["running"] = None
+                self.pools[worker["group"]].extendleft(reversed(worker["queue"]))
+                worker["queue"].clear()
+    
+    def finished(self):
+        return bool(self.units) and all(u["state"] in ("done", "failed") for u in self.units.values())
+    
+    def status(self):
+        with self.lock:
+            groups = {}
+            for unit in self.units.values():
+                counts = groups.setdefault(unit["group"], {"pending": 0, "running": 0, "done": 0, "failed": 0})
+                counts[unit["state"]] += 1
+            workers = {wid: {"group": w["group"], "queued": len(w["queue"]), "running": w["running"],
+                             "completed": w["completed"], "lost": w["lost"]}
+                       for wid, w in self.workers.items()}
+            return {"finished": self.finished(), "groups": groups, "workers": workers}
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP: POST /register, /next, /heartbeat, /result and GET /status"""
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        if self.path == "/status":
+            self.send_json(self.server.coordinator.work.status())
+        else:
+            self.send_json({"error": "not found"}, 404)
+    
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            handler = {
+                "/register": self.server.coordinator.handle_register,
+                "/next": self.server.coordinator.handle_next,
+                "/heartbeat": self.server.coordinator.handle_heartbeat,
+                "/result": self.server.coordinator.handle_result
+            }.get(self.path)
+            if handler:
+                self.send_json(handler(request))
+            else:
+                self.send_json({"error": "not found"}, 404)
+        except Exception as e:
+            self.send_json({"error": str(e)}, 400)
+    
+    def log_message(self, format, *args):
+        pass
+
+class BenchmarkCoordinator:
+    def __init__(self, work, db_path, host="0.0.0.0", port=8765, heartbeat_interval=5, duration=None, repeat=1):
+        self.work = work
+        self.db_path = db_path
+        self.heartbeat_interval = heartbeat_interval
+        self.duration = duration
+        self.repeat = repeat
+        self.campaign_id = uuid.uuid4().hex
+        self.campaign_timestamp = datetime.now().isoformat()
+        self.results = queue.Queue()
+        self.server = ThreadingHTTPServer((host, port), CoordinatorHandler)
+        self.server.daemon_threads = True
+        self.server.coordinator = self
+        self.stored = 0
+    
+    def handle_register(self, request):
+        if not self.work.register(request["worker_id"], request["group"], request.get("system_info")):
+            return {"error": f"unknown group {request['group']}"}
+        return {"campaign_id": self.campaign_id, "heartbeat_interval": self.heartbeat_interval}
+    
+    def handle_next(self, request):
+        unit, done = self.work.next_unit(request["worker_id"])
+        if done is None:
+            return {"register": True}
+        if unit:
+            return {"unit": {"unit_id": unit["unit_id"], "input_file": unit["input_file"], "test": unit["test"],
+                             "duration": self.duration, "repeat": self.repeat}}
+        if done:
+            return {"done": True}
+        return {"wait": self.heartbeat_interval}
+    
+    def handle_heartbeat(self, request):
+        if not self.work.heartbeat(request["worker_id"]):
+            return {"register": True}
+        return {"ok": True}
+    
+    def handle_result(self, request):
+        results = request.get("benchmark_results", [])
+        success = request.get("success", False) and any(r.get("success", False) for r in results)
+        accepted = self.work.complete(request["worker_id"], request["unit_id"], success, request.get("error"))
+        if accepted and results:
+            # Every worker of a group reports into one run per campaign, so the analyzer sees complete runs
+            group = self.work.units[request["unit_id"]]["group"]
+            safe_group = "".join(c if c.isalnum() or c in "-._" else "_" for c in group)
+            request = dict(request, run_id=f"{self.campaign_id}_{safe_group}", run_timestamp=self.campaign_timestamp)
+            self.results.put(request)
+        return {"accepted": accepted}
+    
+    def write_results(self, analyzer_module):
+        """Stream accepted results into the store until the queue is closed with None.
+        
+        SQLite connections stay on the thread that opened them, so the store
+        is opened here and every write goes through this thread.
+        """
+        store = analyzer_module.ResultStore(self.db_path)
+        while True:
+            request = self.results.get()
+            if request is None:
+                return
+            try:
+                with store.conn:
+                    store.append_run(request["run_id"], request, source=f"worker:{request['worker_id']}")
+                self.stored += len(request["benchmark_results"])
+            except Exception as e:
+                print(f"Storing results of {request['unit_id']} failed: {e}")
+    
+    def monitor(self, stop):
+        last_report = 0
+        while not stop.wait(1):
+            self.work.reap()
+            if time.time() - last_report >= 30:
+                last_report = time.time()
+                progress = ", ".join(f"{group}: {c['done']}/{sum(c.values())}"
+                                     for group, c in self.work.status()["groups"].items())
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] {progress or 'waiting for workers'}")
+    
+    def run(self, analyzer_module):
+        """Serve workers until every unit of every group is done or failed"""
+        stop = threading.Event()
+        threads = [threading.Thread(target=self.server.serve_forever),
+                   threading.Thread(target=self.monitor, args=(stop,))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        print(f"Coordinator listening on {self.server.server_address[0]}:{self.server.server_address[1]}")
+        
+        writer = threading.Thread(target=self.write_results, args=(analyzer_module,))
+        writer.start()
+        try:
+            while not self.work.status()["finished"]:
+                time.sleep(1)
+            # Keep answering for a moment so polling workers learn the campaign is over
+            time.sleep(2 * self.heartbeat_interval)
+        finally:
+            stop.set()
+            self.server.shutdown()
+            self.results.put(None)
+            writer.join()
+        
+        status = self.work.status()
+        failed = sum(c["failed"] for c in status["groups"].values())
+        print(f"Campaign complete: {self.stored} results stored in {self.db_path}, {failed} units failed")
+        return status
+
+def main():
+    parser = argparse.ArgumentParser(description='FFmpeg Benchmark Coordinator')
+    parser.add_argument('--input-dir', default='input',
+                        help='Directory listing the input files every worker has, or a corpus manifest')
+    parser.add_argument('--results-dir', default='results', help='Directory for the results store and report')
+    parser.add_argument('--db', help='Results store path (default: <results-dir>/benchmark_results.db)')
+    parser.add_argument('--groups', help='Comma-separated worker groups (instance types) to run the matrix on '
+                                         '(default: every group that registers)')
+    parser.add_argument('--tests', help='Comma-separated encoding tests to run (default: all)')
+    parser.add_argument('--duration', type=int, help='Duration in seconds to process (default: full video)')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of measured runs per test')
+    parser.add_argument('--host', default='0.0.0.0', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--batch-size', type=int, default=2, help='Units dealt to a worker at a time')
+    parser.add_argument('--heartbeat-interval', type=int, default=5, help='Seconds between worker heartbeats')
+    parser.add_argument('--heartbeat-timeout', type=int, default=30, help='Seconds without heartbeat before a worker is lost')
+    parser.add_argument('--max-attempts', type=int, default=3, help='Attempts per unit before it is marked failed')
+    parser.add_argument('--no-analysis', action='store_true', help='Do not generate the report when the campaign ends')
+    args = parser.parse_args()
+    
+    runner = load_script("benchmark_runner", "benchmark-runner.py")
+    analyzer_module = load_script("analyze_results", "analyze-results.py")
+    
+    input_files = [os.path.basename(f) for f in runner.find_input_files(args.input_dir)]
+    if not input_files:
+        print("No input files found!")
+        sys.exit(1)
+    tests = [spec["name"] for spec in runner.ENCODING_TESTS]
+    if args.tests:
+        tests = [t for t in tests if t in args.tests.split(',')]
+    
+    units = [{"name": f"{test}/{input_file}", "input_file": input_file, "test": test}
+             for input_file in input_files for test in tests]
+    groups = [g for g in args.groups.split(',') if g] if args.groups else None
+    work = WorkQueue(units, groups, args.batch_size, args.max_attempts, args.heartbeat_timeout)
+    print(f"{len(units)} work units per group ({len(input_files)} inputs x {len(tests)} tests)")
+    
+    os.makedirs(args.results_dir, exist_ok=True)
+    db_path = args.db or os.path.join(args.results_dir, "benchmark_results.db")
+    coordinator = BenchmarkCoordinator(work, db_path, args.host, args.port, args.heartbeat_interval,
+                                       args.duration, args.repeat)
+    status = coordinator.run(analyzer_module)
+    
+    if not args.no_analysis and coordinator.stored:
+        analyzer = analyzer_module.BenchmarkAnalyzer()
+        analyzer.load_results(args.results_dir, db_path)
+        analyzer.generate_performance_report()
+        analyzer.create_visualizations()
+    
+    sys.exit(1 if any(c["failed"] for c in status["groups"].values()) else 0)
+
+if __name__ == "__main__":
+    main()
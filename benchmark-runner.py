@@ -6,15 +6,847 @@ import time
 import json
 import subprocess
 import psutil
+import re
+import shutil
+import tempfile
 import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 from datetime import datetime
 import argparse
+import gzip
+import hashlib
+import multiprocessing
+import socket
+import statistics
+import urllib.error
+import urllib.request
+import uuid
+
+class QualityScorer:
+    """Score finished encodes with VMAF on a background worker pool.
+    
+    Encodes are queued as soon as they finish. By default the queue is only
+    drained once all encodes are done so scoring never shares cores with a
+    timed encode; with overlap=True jobs start immediately.
+    """
+    def __init__(self, workers=1, n_threads=None, n_subsample=None, overlap=False):
+        self.workers = workers
+        self.n_threads = n_threads or psutil.cpu_count()
+        self.n_subsample = n_subsample
+        self.overlap = overlap
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending = []
+        self.futures = []
+        self.references = {}
+        self.lock = threading.Lock()
+        self.reference_lock = threading.Lock()
+        self.scratch_dir = tempfile.mkdtemp(prefix="ffmpeg-bench-vmaf-")
+    
+    def get_reference(self, input_file, duration_limit=None):
+        """Return the reference segment and its resolution, cut once per input"""
+        key = (input_file, duration_limit)
+        with self.reference_lock:
+            if key not in self.references:
+                reference = input_file
+                if duration_limit:
+                    # Cut the reference segment matching the encoded duration
+                    reference = os.path.join(self.scratch_dir, f"ref_{len(self.references)}_{os.path.basename(input_file)}")
+                    segment_cmd = ["ffmpeg", "-y", "-i", input_file, "-t", str(duration_limit), "-c", "copy", reference]
+                    subprocess.run(segment_cmd, capture_output=True, timeout=300)
+                
+                probe_cmd = ["ffprobe", "-v", "quiet", "-select_streams", "v:0", "-show_entries",
+                             "stream=width,height", "-of", "json", reference]
+                probe = subprocess.run(probe_cmd, capture_output=True, text=True)
+                stream = json.loads(probe.stdout)['streams'][0] if probe.returncode == 0 else {}
+                self.references[key] = (reference, stream.get('width'), stream.get('height'))
+            return self.references[key]
+    
+    def run_vmaf(self, reference_video, encoded_video, width=None, height=None, n_subsample=None):
+        """Run libvmaf and return its parsed JSON log"""
+        fd, log_path = tempfile.mkstemp(suffix=".json", dir=self.scratch_dir)
+        os.close(fd)
+        
+        n_subsample = n_subsample or self.n_subsample
+        vmaf_options = f"log_fmt=json:log_path={log_path}:n_threads={self.n_threads}"
+        if n_subsample:
+            vmaf_options += f":n_subsample={n_subsample}"
+        # Scale the encode back to the reference resolution for transcode tests
+        scale = f"scale={width}:{height}:flags=bicubic" if width and height else "null"
+        cmd = [
+            "ffmpeg", "-i", encoded_video, "-i", reference_video,
+            "-lavfi", f"[0:v]{scale}[dist];[dist][1:v]libvmaf={vmaf_options}",
+            "-f", "null", "-"
+        ]
+        
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, timeout=1800)
+            with open(log_path, 'r') as f:
+                return json.load(f)
+        except:
+            return None
+        finally:
+            if os.path.exists(log_path):
+                os.remove(log_path)
+    
+    def calculate_vmaf(self, reference_video, encoded_video, width=None, height=None, n_subsample=None):
+        """Calculate VMAF score between reference and encoded video"""
+        vmaf_data = self.run_vmaf(reference_video, encoded_video, width, height, n_subsample)
+        return vmaf_data['pooled_metrics']['vmaf']['mean'] if vmaf_data else None
+    
+    def frame_scores(self, reference_video, encoded_video, width=None, height=None):
+        """Per-frame VMAF scores keyed by frame number (only scored frames when subsampling)"""
+        vmaf_data = self.run_vmaf(reference_video, encoded_video, width, height)
+        if not vmaf_data:
+            return {}
+        return {frame['frameNum']: frame['metrics']['vmaf'] for frame in vmaf_data.get('frames', [])}
+    
+    def score(self, test_result, input_file, encoded_video, duration_limit=None, callback=None):
+        """Score one encode and store the result in its test_result"""
+        start_time = time.time()
+        try:
+            reference, width, height = self.get_reference(input_file, duration_limit)
+            test_result["vmaf_score"] = self.calculate_vmaf(reference, encoded_video, width, height)
+        except Exception as e:
+            print(f"VMAF for {test_result['test_name']} failed: {e}")
+        test_result["vmaf_duration"] = time.time() - start_time
+        
+        if test_result.get("vmaf_score") is not None:
+            print(f"VMAF for {test_result['test_name']}: {test_result['vmaf_score']:.1f}")
+        if callback:
+            callback(test_result)
+    
+    def score_boundaries(self, summary, input_file, chunked_video, single_video, duration_limit=None, window=12):
+        """Compare per-frame VMAF of a chunked encode with the single-process encode.
+        
+        Frames within `window` frames of a chunk boundary are reported
+        separately from the rest, so quality lost at chunk starts (fresh
+        rate control, no references across the cut) shows up on its own.
+        """
+        try:
+            reference, width, height = self.get_reference(input_file, duration_limit)
+            chunked = self.frame_scores(reference, chunked_video, width, height)
+            single = self.frame_scores(reference, single_video, width, height)
+        except Exception as e:
+            print(f"Boundary VMAF for {summary['test_name']} failed: {e}")
+            return
+        
+        frames = sorted(set(chunked) & set(single))
+        if not frames:
+            return
+        near_boundary = [f for f in frames if any(abs(f - b) < window for b in summary["boundaries"])]
+        interior = [f for f in frames if f not in set(near_boundary)]
+        
+        def mean(values):
+            return sum(values) / len(values) if values else None
+        
+        summary["vmaf_chunked"] = mean([chunked[f] for f in frames])
+        summary["vmaf_single"] = mean([single[f] for f in frames])
+        summary["vmaf_delta"] = mean([chunked[f] - single[f] for f in frames])
+        summary["boundary_vmaf_delta"] = mean([chunked[f] - single[f] for f in near_boundary])
+        summary["interior_vmaf_delta"] = mean([chunked[f] - single[f] for f in interior])
+        summary["boundary_window"] = window
+        
+        if summary["boundary_vmaf_delta"] is not None:
+            print(f"Chunk boundary VMAF for {summary['test_name']}: {summary['boundary_vmaf_delta']:+.2f} "
+                  f"(interior {summary['interior_vmaf_delta'] or 0:+.2f})")
+    
+    def queue(self, fn, *args):
+        """Run a scoring job now (overlap mode) or once the queue is drained"""
+        with self.lock:
+            if self.overlap:
+                self.futures.append(self.executor.submit(fn, *args))
+            else:
+                self.pending.append((fn, args))
+    
+    def submit(self, test_result, input_file, encoded_video, duration_limit=None, callback=None):
+        """Queue an encode for scoring; callback receives the scored test_result"""
+        self.queue(self.score, test_result, input_file, encoded_video, duration_limit, callback)
+    
+    def submit_boundaries(self, summary, input_file, chunked_video, single_video, duration_limit=None):
+        """Queue a chunk boundary comparison; scores are added to the summary"""
+        self.queue(self.score_boundaries, summary, input_file, chunked_video, single_video, duration_limit)
+    
+    def drain(self):
+        """Score all queued encodes and wait for them to finish"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+            self.futures.extend(self.executor.submit(fn, *args) for fn, args in pending)
+            futures, self.futures = self.futures, []
+        
+        if any(not f.done() for f in futures):
+            print(f"\nWaiting for {len(futures)} VMAF jobs ({self.workers} workers, {self.n_threads} threads each)")
+            wait(futures)
+    
+    def close(self):
+        """Stop the worker pool and remove scratch files"""
+        self.drain()
+        self.executor.shutdown()
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+class ProcessMonitor:
+    """Sample CPU, memory, thread and I/O usage of a process tree.
+    
+    Samples are kept in a fixed-size ring buffer; running totals cover the
+    whole run so long encodes are summarised correctly.
+    """
+    def __init__(self, pid, interval=0.1, buffer_size=600):
+        self.interval = interval
+        self.samples = deque(maxlen=buffer_size)
+        self.sample_count = 0
+        self.rss_total = 0
+        self.peak_rss = 0
+        self.max_threads = 0
+        self.cpu_times = (0.0, 0.0)
+        self.ctx_switches = (0, 0)
+        self.io = {"read_bytes": 0, "write_bytes": 0, "read_chars": 0, "write_chars": 0}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        try:
+            self.process = psutil.Process(pid)
+        except psutil.NoSuchProcess:
+            self.process = None
+    
+    def start(self):
+        """Start sampling in a background thread"""
+        self.start_time = time.time()
+        self.start_cpu_times = psutil.cpu_times(percpu=True)
+        self.start_iowait = getattr(psutil.cpu_times(), 'iowait', 0.0)
+        self.thread.start()
+    
+    def sample(self):
+        """Record one sample of the process and its children"""
+        if self.process is None:
+            return
+        try:
+            processes = [self.process] + self.process.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+        
+        user, system, rss, threads, voluntary, involuntary = 0.0, 0.0, 0, 0, 0, 0
+        io = dict.fromkeys(self.io, 0)
+        for proc in processes:
+            try:
+                with proc.oneshot():
+                    cpu_times = proc.cpu_times()
+                    user += cpu_times.user
+                    system += cpu_times.system
+                    rss += proc.memory_info().rss
+                    threads += proc.num_threads()
+                    ctx = proc.num_ctx_switches()
+                    voluntary += ctx.voluntary
+                    involuntary += ctx.involuntary
+                    counters = proc.io_counters()
+                    for key in io:
+                        io[key] += getattr(counters, key, 0)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        
+        self.samples.append((time.time() - self.start_time, user + system, rss, threads))
+        self.sample_count += 1
+        self.rss_total += rss
+        self.peak_rss = max(self.peak_rss, rss)
+        self.max_threads = max(self.max_threads, threads)
+        self.cpu_times = (max(self.cpu_times[0], user), max(self.cpu_times[1], system))
+        self.ctx_switches = (max(self.ctx_switches[0], voluntary), max(self.ctx_switches[1], involuntary))
+        self.io = {key: max(self.io[key], io[key]) for key in io}
+    
+    def run(self):
+        while not self.stop_event.is_set():
+            self.sample()
+            self.stop_event.wait(self.interval)
+    
+    def per_core_utilization(self):
+        """Busy percentage of each core since start"""
+        utilization = []
+        for before, after in zip(self.start_cpu_times, psutil.cpu_times(percpu=True)):
+            total = sum(after) - sum(before)
+            idle = (after.idle - before.idle) + (getattr(after, 'iowait', 0) - getattr(before, 'iowait', 0))
+            utilization.append(round(100 * (total - idle) / total, 1) if total > 0 else 0.0)
+        return utilization
+    
+    def stop(self, rusage=None):
+        """Stop sampling and summarise the run, preferring exact rusage totals"""
+        self.stop_event.set()
+        self.thread.join()
+        
+        elapsed = time.time() - self.start_time
+        cpu_count = psutil.cpu_count()
+        samples = list(self.samples)
+        
+        # CPU percent of the whole machine between consecutive samples
+        cpu_percent = []
+        for (t0, c0, _, _), (t1, c1, _, _) in zip(samples, samples[1:]):
+            if t1 > t0:
+                cpu_percent.append(min(100.0, 100 * (c1 - c0) / (t1 - t0) / cpu_count))
+        
+        # Block I/O comes from rusage (512-byte blocks) when available; read/write chars (syscall
+        # level, page cache hits included) are only sampled, so they miss the last interval
+        if rusage:
+            user_seconds, system_seconds = rusage.ru_utime, rusage.ru_stime
+            peak_rss = max(self.peak_rss, rusage.ru_maxrss * 1024)
+            voluntary, involuntary = rusage.ru_nvcsw, rusage.ru_nivcsw
+            read_bytes, write_bytes = rusage.ru_inblock * 512, rusage.ru_oublock * 512
+        else:
+            user_seconds, system_seconds = self.cpu_times
+            peak_rss = self.peak_rss
+            voluntary, involuntary = self.ctx_switches
+            read_bytes, write_bytes = self.io["read_bytes"], self.io["write_bytes"]
+        cpu_seconds = user_seconds + system_seconds
+        
+        return {
+            "avg_cpu_usage": 100 * cpu_seconds / elapsed / cpu_count if elapsed > 0 else 0,
+            "max_cpu_usage": max(cpu_percent) if cpu_percent else 0,
+            "cpu_user_seconds": user_seconds,
+            "cpu_system_seconds": system_seconds,
+            "cpu_seconds": cpu_seconds,
+            "peak_rss_bytes": peak_rss,
+            "avg_rss_bytes": self.rss_total / self.sample_count if self.sample_count else 0,
+            "max_threads": self.max_threads,
+            "voluntary_ctx_switches": voluntary,
+            "involuntary_ctx_switches": involuntary,
+            "read_bytes": read_bytes,
+            "write_bytes": write_bytes,
+            "read_chars": self.io["read_chars"],
+            "write_chars": self.io["write_chars"],
+            # Machine-wide I/O wait summed over cores while the command ran
+            "iowait_seconds": getattr(psutil.cpu_times(), 'iowait', 0.0) - self.start_iowait,
+            "per_core_utilization": self.per_core_utilization(),
+            "sample_interval": self.interval,
+            "sample_count": self.sample_count,
+            "resource_samples": [[round(t, 3), round(c, 3), r, n] for t, c, r, n in samples]
+        }
+
+# Share of each test's wall time treated as encoder warm-up (lookahead fill, thread start-up)
+PROGRESS_WARMUP_FRACTION = 0.2
+
+def parse_progress_value(key, value):
+    """Convert one ffmpeg -progress value to a number"""
+    value = value.strip()
+    if value in ("N/A", ""):
+        return None
+    try:
+        if key == "speed":
+            return float(value.rstrip("x"))
+        if key == "bitrate":
+            return float(value.replace("kbits/s", ""))
+        if key in ("out_time_us", "out_time_ms"):
+            # Both keys are reported in microseconds by ffmpeg
+            return int(value) / 1e6
+        return float(value) if "." in value else int(value)
+    except ValueError:
+        return None
+
+def read_progress(stream, start_time, samples):
+    """Parse an ffmpeg -progress key/value stream as it arrives"""
+    block = {}
+    for line in stream:
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        key = key.strip()
+        if key == "progress":
+            samples.append({
+                "t": time.time() - start_time,
+                "frame": block.get("frame"),
+                "fps": block.get("fps"),
+                "speed": block.get("speed"),
+                "bitrate": block.get("bitrate"),
+                "out_time": block.get("out_time_us", block.get("out_time_ms")),
+                "drop_frames": block.get("drop_frames"),
+                "dup_frames": block.get("dup_frames")
+            })
+            block = {}
+        elif key in ("frame", "fps", "speed", "bitrate", "out_time_us", "out_time_ms", "drop_frames", "dup_frames"):
+            block[key] = parse_progress_value(key, value)
+
+def summarize_progress(samples, duration, warmup_fraction=PROGRESS_WARMUP_FRACTION):
+    """Compute frame count, average and steady-state FPS/speed from progress samples"""
+    samples = [s for s in samples if s["frame"] is not None]
+    if not samples:
+        return {}
+    
+    last = samples[-1]
+    summary = {
+        "frames_encoded": last["frame"],
+        "dropped_frames": last["drop_frames"] or 0,
+        "avg_fps": last["frame"] / duration if duration > 0 else None,
+        "avg_speed": last["out_time"] / duration if last["out_time"] and duration > 0 else None,
+        "steady_state_fps": None,
+        "steady_state_speed": None
+    }
+    
+    # Measure from the first sample after warm-up to the last sample
+    cutoff = warmup_fraction * duration
+    first = next((s for s in samples if s["t"] >= cutoff), None)
+    if first is not None and last["t"] > first["t"]:
+        elapsed = last["t"] - first["t"]
+        summary["steady_state_fps"] = (last["frame"] - first["frame"]) / elapsed
+        if last["out_time"] is not None and first["out_time"] is not None:
+            summary["steady_state_speed"] = (last["out_time"] - first["out_time"]) / elapsed
+    return summary
+
+# Encoding test matrix; "filter" is the scaling step applied before the encoder
+ENCODING_TESTS = [
+    # H.264 encoding tests
+    {"name": "h264_1mbps", "output": "h264_1m_{base_name}.mp4", "video_args": ["-c:v", "libx264", "-b:v", "1M"]},
+    {"name": "h264_5mbps", "output": "h264_5m_{base_name}.mp4", "video_args": ["-c:v", "libx264", "-b:v", "5M"]},
+    # H.265 encoding tests
+    {"name": "h265_1mbps", "output": "h265_1m_{base_name}.mp4", "video_args": ["-c:v", "libx265", "-b:v", "1M"]},
+    {"name": "h265_5mbps", "output": "h265_5m_{base_name}.mp4", "video_args": ["-c:v", "libx265", "-b:v", "5M"]},
+    # Transcode to different resolutions
+    {"name": "transcode_720p", "output": "720p_{base_name}.mp4", "filter": "scale=1280:720",
+     "video_args": ["-c:v", "libx265", "-crf", "23"]},
+    {"name": "transcode_540p", "output": "540p_{base_name}.mp4", "filter": "scale=960:540",
+     "video_args": ["-c:v", "libx265", "-crf", "23"]},
+    {"name": "transcode_360p", "output": "360p_{base_name}.mp4", "filter": "scale=640:360",
+     "video_args": ["-c:v", "libx265", "-crf", "23"]}
+]
+
+# Thread-count and preset scaling sweep. "threads": "auto" means powers of two up to the
+# available cores plus the core count itself; x265 threads map to its thread pool size.
+DEFAULT_SWEEP = {
+    "codecs": {
+        "libx264": {"presets": ["veryfast", "medium", "slow"], "threads": "auto", "video_args": ["-b:v", "5M"]},
+        "libx265": {"presets": ["ultrafast", "medium"], "threads": "auto", "frame_threads": [1, 2],
+                    "video_args": ["-b:v", "5M"]}
+    }
+}
+
+def expand_sweep(sweep, cpu_count):
+    """Expand a declarative sweep into test specs"""
+    specs = []
+    for codec, options in sweep["codecs"].items():
+        threads = options.get("threads", "auto")
+        if threads == "auto":
+            threads = sorted({2 ** i for i in range(cpu_count.bit_length()) if 2 ** i <= cpu_count} | {cpu_count})
+        threads = [n for n in threads if n <= cpu_count]
+        
+        for preset in options.get("presets", ["medium"]):
+            for n in threads:
+                for frame_threads in options.get("frame_threads", [None]):
+                    if codec == "libx265":
+                        x265_params = f"pools={n}" + (f":frame-threads={frame_threads}" if frame_threads else "")
+                        thread_args = ["-x265-params", x265_params]
+                    else:
+                        thread_args = ["-threads", str(n)]
+                    
+                    suffix = f"_ft{frame_threads}" if frame_threads else ""
+                    name = f"sweep_{codec}_{preset}_t{n}{suffix}"
+                    specs.append({
+                        "name": name,
+                        "output": f"{name}_{{base_name}}.mp4",
+                        "filter": options.get("filter"),
+                        "video_args": ["-c:v", codec, "-preset", preset] + thread_args + options.get("video_args", []),
+                        "metadata": {"sweep": True, "codec": codec, "preset": preset, "threads": n,
+                                     "frame_threads": frame_threads}
+                    })
+    return specs
+
+# Rate-quality search ranges per codec. CRF is searched in whole steps for the highest CRF
+# that reaches the target; bitrate (kbit/s) on a log scale to within 5% for the lowest.
+QUALITY_SEARCH_RANGES = {
+    "libx264": {"crf": (10, 40), "bitrate": (200, 20000)},
+    "libx265": {"crf": (10, 40), "bitrate": (150, 15000)}
+}
+# Probe encodes use a sample of evenly spaced short segments of each input
+QUALITY_SAMPLE_SEGMENTS = 3
+QUALITY_SAMPLE_SECONDS = 2
+
+# Cumulative instruction set levels for the ISA ablation. "cpuflags" restricts ffmpeg's own
+# SIMD code (decoders, scalers) via -cpuflags; x264 and x265 detect CPU features themselves
+# and are limited with their asm parameter. "requires" is the /proc/cpuinfo flag a level
+# needs; levels the CPU lacks are skipped. The unrestricted run is the regular test.
+ISA_LEVELS = {
+    "x86_64": [
+        {"name": "c", "cpuflags": "0", "asm": "0"},
+        {"name": "sse2", "requires": "sse2", "cpuflags": "mmx+mmxext+sse+sse2", "asm": "MMX2,SSE,SSE2"},
+        {"name": "sse4.2", "requires": "sse4_2", "cpuflags": "mmx+mmxext+sse+sse2+sse3+ssse3+sse4.1+sse4.2",
+         "asm": "MMX2,SSE,SSE2,SSE3,SSSE3,SSE4.1,SSE4.2"},
+        {"name": "avx2", "requires": "avx2",
+         "cpuflags": "mmx+mmxext+sse+sse2+sse3+ssse3+sse4.1+sse4.2+avx+fma3+bmi1+bmi2+avx2",
+         "asm": "MMX2,SSE,SSE2,SSE3,SSSE3,SSE4.1,SSE4.2,AVX,FMA3,LZCNT,BMI1,BMI2,AVX2"},
+        {"name": "avx512", "requires": "avx512f",
+         "cpuflags": "mmx+mmxext+sse+sse2+sse3+ssse3+sse4.1+sse4.2+avx+fma3+bmi1+bmi2+avx2+avx512",
+         "asm": "MMX2,SSE,SSE2,SSE3,SSSE3,SSE4.1,SSE4.2,AVX,FMA3,LZCNT,BMI1,BMI2,AVX2,AVX512"}
+    ],
+    "aarch64": [
+        {"name": "c", "cpuflags": "0", "asm": "0"},
+        {"name": "neon", "requires": "asimd", "cpuflags": "armv8+vfp+neon", "asm": "ARMv8,NEON"}
+    ]
+}
+
+def isa_video_args(video_args, asm):
+    """Add an x264/x265 asm restriction to encoder arguments"""
+    args = list(video_args)
+    codec = args[args.index("-c:v") + 1] if "-c:v" in args else None
+    params_key = {"libx264": "-x264-params", "libx265": "-x265-params"}.get(codec)
+    if not params_key:
+        return args
+    if params_key in args:
+        i = args.index(params_key) + 1
+        args[i] = f"{args[i]}:asm={asm}"
+    else:
+        args += [params_key, f"asm={asm}"]
+    return args
+
+def get_cpu_flags():
+    """CPU feature flags from /proc/cpuinfo (x86 "flags", arm64 "Features")"""
+    try:
+        with open("/proc/cpuinfo", 'r') as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip() in ("flags", "Features"):
+                    return value.split()
+    except OSError:
+        pass
+    return []
+
+# Live ABR rendition used by the channel density search
+DENSITY_TEST = {
+    "name": "live_1080p_to_720p",
+    "filter": "scale=1280:720",
+    "video_args": ["-c:v", "libx264", "-preset", "veryfast", "-b:v", "3M", "-maxrate", "3M", "-bufsize", "6M", "-g", "60"]
+}
+
+# Low-latency live encodes: zero-latency tuning, no B-frames and a VBV buffer of one frame, fed
+# raw frames over stdin at a fixed rate. Access unit delimiters mark where each output frame starts.
+LATENCY_FPS = 30
+LATENCY_SECONDS = 10
+LATENCY_TESTS = [
+    {"name": "latency_h264_720p", "filter": "scale=1280:720", "format": "h264", "bitrate": 3000000,
+     "video_args": ["-c:v", "libx264", "-preset", "veryfast", "-tune", "zerolatency", "-bf", "0", "-x264-params", "aud=1"]},
+    {"name": "latency_h264_1080p", "filter": "scale=1920:1080", "format": "h264", "bitrate": 6000000,
+     "video_args": ["-c:v", "libx264", "-preset", "veryfast", "-tune", "zerolatency", "-bf", "0", "-x264-params", "aud=1"]},
+    {"name": "latency_h265_720p", "filter": "scale=1280:720", "format": "hevc", "bitrate": 2000000,
+     "video_args": ["-c:v", "libx265", "-preset", "ultrafast", "-tune", "zerolatency", "-bf", "0", "-x265-params", "aud=1"]}
+]
+
+# Start code plus NAL header of an access unit delimiter
+AUD_START_CODES = {"h264": b"\x00\x00\x01\x09", "hevc": b"\x00\x00\x01\x46\x01"}
+
+def percentile(values, q):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    rank = -(-q * len(ordered) // 100)
+    return ordered[min(len(ordered) - 1, max(0, int(rank) - 1))]
+
+def read_access_units(stream, start_code, arrivals):
+    """Record when each access unit of an Annex B stream has fully arrived on a pipe.
+    
+    An access unit is complete when the delimiter of the next one shows up, at
+    the time of the read that carried its last bytes; the final one completes
+    at end of stream. The last bytes of earlier reads are kept with their read
+    times, so a delimiter split across reads is found and the unit before it
+    is stamped with the read that actually ended it.
+    """
+    fd = stream.fileno()
+    keep = len(start_code)
+    tail = b""
+    tail_times = []
+    last_read = None
+    started = False
+    while True:
+        chunk = os.read(fd, 1024 * 1024)
+        now = time.time()
+        if not chunk:
+            break
+        data = tail + chunk
+        # Delimiters lying wholly in the tail were found by an earlier read
+        pos = data.find(start_code, max(0, len(tail) - keep + 1))
+        while pos != -1:
+            if started:
+                # The previous access unit ends with the byte before the delimiter
+                arrivals.append(now if pos > len(tail) else tail_times[pos - 1] if pos > 0 else last_read)
+            started = True
+            pos = data.find(start_code, pos + 1)
+        tail = data[-keep:]
+        tail_times = (tail_times + [now] * min(len(chunk), keep))[-keep:]
+        last_read = now
+    if started:
+        arrivals.append(last_read)
+
+# Small-file batch tasks: thumbnails and previews of short video clips, and audio snippets
+# encoded to the common delivery codecs. Each task is run one file per ffmpeg process and
+# with many inputs and outputs per process, serially and on a pre-forked worker pool.
+BATCH_CLIP_SECONDS = 2
+BATCH_FILE_COUNTS = [10, 50, 100, 500]
+BATCH_SIZE = 25
+BATCH_MODES = ("per_file", "batched", "pool", "pool_batched")
+BATCH_TASKS = [
+    {"name": "thumbnail", "source": "video", "ext": "jpg", "input_args": ["-ss", str(BATCH_CLIP_SECONDS / 2)],
+     "output_args": ["-frames:v", "1", "-vf", "scale=320:-2", "-q:v", "3"]},
+    {"name": "preview_360p", "source": "video", "ext": "mp4", "input_args": [],
+     "output_args": ["-vf", "scale=-2:360", "-c:v", "libx264", "-preset", "veryfast", "-crf", "28"]},
+    {"name": "audio_aac", "source": "audio", "ext": "m4a", "input_args": [], "output_args": ["-c:a", "aac", "-b:a", "128k"]},
+    {"name": "audio_mp3", "source": "audio", "ext": "mp3", "input_args": [], "output_args": ["-c:a", "libmp3lame", "-b:a", "128k"]},
+    {"name": "audio_opus", "source": "audio", "ext": "opus", "input_args": [], "output_args": ["-c:a", "libopus", "-b:a", "96k"]}
+]
+
+class DecodeCache:
+    """Decode each input once, and once per scale filter, into raw y4m files.
+    
+    Entries are keyed by input file, filter chain and duration and are kept
+    between runs (on tmpfs by default) together with the time it took to
+    build them, so decode and scale cost can be reported next to encode cost.
+    Before an entry is built, entries this run has not used are evicted
+    until its estimated size fits; if it still does not fit, get() returns
+    None and the test reads the original file.
+    """
+    # Space left free on the cache filesystem after an entry is built
+    RESERVE_BYTES = 1 << 30
+    
+    def __init__(self, cache_dir="/dev/shm/ffmpeg-bench-cache"):
+        self.cache_dir = cache_dir
+        self.entries = {}
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def entry_path(self, input_file, filter_chain, duration):
+        """Cache file path for an input, filter chain and duration"""
+        stat = os.stat(input_file)
+        key = f"{os.path.abspath(input_file)}|{stat.st_size}|{stat.st_mtime}|{filter_chain}|{duration}"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        return os.path.join(self.cache_dir, f"{base_name}_{digest}.y4m")
+    
+    def estimate_bytes(self, input_file, filter_chain, duration):
+        """Size of the raw y4m frames of an input (scaled by a scale=W:H filter), or None if it cannot be probed"""
+        cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries",
+               "stream=width,height,pix_fmt,r_frame_rate:format=duration", "-of", "json", input_file]
+        try:
+            info = json.loads(subprocess.run(cmd, capture_output=True, text=True).stdout)
+            stream = info["streams"][0]
+            width, height = stream["width"], stream["height"]
+            num, den = stream["r_frame_rate"].split('/')
+            frames = float(num) / float(den) * float(duration or info["format"]["duration"])
+        except:
+            return None
+        
+        scale = re.search(r"scale=(\d+):(\d+)", filter_chain or "")
+        if scale:
+            width, height = int(scale.group(1)), int(scale.group(2))
+        pix_fmt = stream.get("pix_fmt", "")
+        bytes_per_sample = 2 if any(depth in pix_fmt for depth in ("10", "12", "16")) else 1
+        samples_per_pixel = 1.5 if "420" in pix_fmt or pix_fmt == "nv12" else 3
+        return int(width * height * samples_per_pixel * bytes_per_sample * frames)
+    
+    def ensure_space(self, needed):
+        """Evict entries this run has not used, oldest first, until `needed` bytes fit; False if they never do"""
+        in_use = {entry[0] for entry in self.entries.values() if entry}
+        stale = sorted((os.path.getmtime(path), path) for path in
+                       (os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".y4m"))
+                       if path not in in_use)
+        while shutil.disk_usage(self.cache_dir).free - needed < self.RESERVE_BYTES:
+            if not stale:
+                return False
+            _, path = stale.pop(0)
+            print(f"Evicting decode cache entry {path}")
+            for stale_file in (path, path + ".json"):
+                if os.path.exists(stale_file):
+                    os.remove(stale_file)
+        return True
+    
+    def get(self, input_file, filter_chain=None, duration=None):
+        """Return the cached raw file and the seconds spent building it, or None if it does not fit"""
+        key = (input_file, filter_chain, duration)
+        if key in self.entries:
+            return self.entries[key]
+        
+        path = self.entry_path(input_file, filter_chain, duration)
+        info_path = path + ".json"
+        if os.path.exists(path) and os.path.exists(info_path):
+            with open(info_path, 'r') as f:
+                self.entries[key] = (path, json.load(f)["seconds"])
+            return self.entries[key]
+        
+        decoded = self.get(input_file, None, duration) if filter_chain else None
+        needed = self.estimate_bytes(input_file, filter_chain, duration)
+        if (filter_chain and decoded is None) or (needed and not self.ensure_space(needed)):
+            if needed:
+                print(f"No room in {self.cache_dir} for {needed / 1024**2:.0f} MB of raw frames of {input_file}, "
+                      f"reading the original file")
+            self.entries[key] = None
+            return None
+        
+        if filter_chain:
+            # Scale from the decoded frames so this step only measures scaling
+            source = decoded[0]
+            cmd = ["ffmpeg", "-y", "-i", source, "-vf", filter_chain, "-f", "yuv4mpegpipe", "-strict", "-1", path]
+            print(f"Caching {filter_chain} frames of {input_file}")
+        else:
+            duration_args = ["-t", str(duration)] if duration else []
+            cmd = ["ffmpeg", "-y"] + duration_args + ["-i", input_file, "-map", "0:v:0", "-f", "yuv4mpegpipe", "-strict", "-1", path]
+            print(f"Caching decoded frames of {input_file}")
+        
+        start_time = time.time()
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        seconds = time.time() - start_time
+        if result.returncode != 0:
+            if os.path.exists(path):
+                os.remove(path)
+            raise RuntimeError(f"Failed to build decode cache entry for {input_file}: {result.stderr[-500:]}")
+        
+        with open(info_path, 'w') as f:
+            json.dump({"input_file": input_file, "filter": filter_chain, "duration": duration, "seconds": seconds}, f)
+        self.entries[key] = (path, seconds)
+        return self.entries[key]
+
+class ResultJournal:
+    """Append-only JSONL journal of test results.
+    
+    Every result is written and fsynced as soon as it completes, with its
+    ffmpeg logs moved to separate gzip files. A later record with the same
+    fingerprint supersedes an earlier one (e.g. once VMAF has been added).
+    """
+    def __init__(self, output_dir, host, run_id=""):
+        safe_host = "".join(c if c.isalnum() or c in "-._" else "_" for c in host)
+        self.path = os.path.join(output_dir, f"journal_{safe_host}.jsonl")
+        self.run_id = run_id
+        self.log_dir = os.path.join(output_dir, "logs")
+        self.lock = threading.Lock()
+        os.makedirs(self.log_dir, exist_ok=True)
+    
+    def load(self):
+        """Return the latest journaled record for each fingerprint"""
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Ignore a record truncated by a crash
+                    continue
+                if record.get("fingerprint"):
+                    records[record["fingerprint"]] = record
+        return records
+    
+    def store_logs(self, test_result):
+        """Move stderr/stdout out of the result into compressed log files"""
+        for stream in ("stderr", "stdout"):
+            text = test_result.pop(stream, None)
+            if text:
+                # Results without a fingerprint (latency tests) are kept apart by run and repetition
+                prefix = test_result.get('fingerprint', '')[:16] or f"{self.run_id[:16]}_r{test_result.get('repetition', 0)}"
+                name = f"{prefix}_{test_result['test_name']}.{stream}.gz"
+                log_path = os.path.join(self.log_dir, name)
+                with gzip.open(log_path, 'wt') as f:
+                    f.write(text)
+                test_result[f"{stream}_log"] = log_path
+    
+    def append(self, test_result):
+        """Append a result to the journal"""
+        with self.lock:
+            self.store_logs(test_result)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(test_result) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+class CoordinatorClient:
+    """Worker side of the benchmark-coordinator.py protocol (JSON over HTTP).
+    
+    Heartbeats are sent from a background thread while units run so the
+    coordinator can tell a long encode from a dead worker.
+    """
+    def __init__(self, url, worker_id, group):
+        self.url = url.rstrip('/')
+        self.worker_id = worker_id
+        self.group = group
+        self.heartbeat_interval = 5
+        self.stopped = threading.Event()
+        self.heartbeat_thread = None
+    
+    def post(self, path, data, timeout=30):
+        request = urllib.request.Request(self.url + path, data=json.dumps(dict(data, worker_id=self.worker_id)).encode(),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    
+    def register(self, system_info):
+        response = self.post("/register", {"group": self.group, "system_info": system_info})
+        if "error" in response:
+            raise RuntimeError(f"Coordinator rejected worker: {response['error']}")
+        self.heartbeat_interval = response.get("heartbeat_interval", self.heartbeat_interval)
+        self.system_info = system_info
+        return response
+    
+    def heartbeats(self):
+        while not self.stopped.wait(self.heartbeat_interval):
+            try:
+                if self.post("/heartbeat", {}).get("register"):
+                    self.register(self.system_info)
+            except (urllib.error.URLError, OSError) as e:
+                print(f"Heartbeat failed: {e}")
+    
+    def start(self, system_info):
+        self.register(system_info)
+        self.heartbeat_thread = threading.Thread(target=self.heartbeats, daemon=True)
+        self.heartbeat_thread.start()
+    
+    def stop(self):
+        self.stopped.set()
+
+# Where encodes write their output: a file in output/, a file on tmpfs, the null muxer,
+# or a Matroska stream on stdout that the runner reads and discards
+OUTPUT_SINKS = ("disk", "tmpfs", "null", "pipe")
+
+INPUT_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv')
+
+def find_input_files(input_path):
+    """Input files with their content metadata, from a directory or a build-corpus.py manifest"""
+    if not os.path.isfile(input_path):
+        return {os.path.join(input_path, file): {} for file in sorted(os.listdir(input_path))
+                if file.endswith(INPUT_EXTENSIONS)}
+    
+    with open(input_path, 'r') as f:
+        manifest = json.load(f)
+    input_files = {}
+    for clip in manifest["clips"]:
+        path = os.path.join(os.path.dirname(input_path), clip["file"])
+        if not os.path.exists(path):
+            print(f"Warning: {clip['file']} listed in {input_path} is missing, skipping")
+            continue
+        input_files[path] = {
+            "content_clip": clip["name"],
+            "content_tier": clip["tier"],
+            "content_source": clip["source"],
+            "content_resolution": clip["resolution"],
+            "content_fps": clip["fps"],
+            "content_duration": clip["duration"]
+        }
+    return input_files
 
 class FFmpegBenchmark:
-    def __init__(self, output_dir="results"):
+    def __init__(self, output_dir="results", quality_scorer=None, sample_interval=0.1, sample_buffer=600,
+                 repeat=1, warmup=0, output_sink="disk", tmpfs_dir="/dev/shm/ffmpeg-bench-output"):
         self.output_dir = output_dir
+        self.quality_scorer = quality_scorer
+        self.sample_interval = sample_interval
+        self.sample_buffer = sample_buffer
+        self.repeat = repeat
+        self.warmup = warmup
+        self.output_sink = output_sink
+        self.tmpfs_dir = tmpfs_dir
+        if output_sink == "tmpfs":
+            os.makedirs(tmpfs_dir, exist_ok=True)
+        self.run_id = uuid.uuid4().hex
+        self.run_timestamp = datetime.now().isoformat()
         self.results = []
-        self.monitoring = True
+        self.concurrency_results = []
+        self.density_results = []
+        self.chunked_results = []
+        self.quality_search_results = []
+        self.journal = None
+        self.completed = {}
+        self.input_hashes = {}
+        self.input_metadata = {}
+        self.ffmpeg_version = None
+        self.instance_type = None
+        self.batch_results = []
+        self.probe_cache = {}
+        self.probe_stats = {"hits": 0, "misses": 0}
         
     def get_instance_type(self):
         """Get EC2 instance type from metadata service (IMDSv2)"""
@@ -35,24 +867,124 @@ class FFmpegBenchmark:
         except:
             return None
     
+    def get_ffmpeg_version(self):
+        """First line of ffmpeg -version"""
+        if self.ffmpeg_version is None:
+            try:
+                result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
+                self.ffmpeg_version = result.stdout.splitlines()[0] if result.stdout else ""
+            except OSError:
+                self.ffmpeg_version = ""
+        return self.ffmpeg_version
+    
+    def get_ffmpeg_configuration(self):
+        """Build configuration (configure flags) of the ffmpeg binary"""
+        try:
+            result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
+            for line in result.stdout.splitlines():
+                if line.startswith("configuration:"):
+                    return line.split(":", 1)[1].split()
+        except OSError:
+            pass
+        return []
+    
+    def get_host(self):
+        """Host identity used in test fingerprints: the instance type on EC2, otherwise the hostname"""
+        if self.instance_type is None:
+            self.instance_type = self.get_instance_type() or ""
+        return self.instance_type or socket.gethostname()
+    
+    def hash_input(self, input_file):
+        """SHA-256 of an input file, cached by path, size and mtime"""
+        stat = os.stat(input_file)
+        key = (os.path.abspath(input_file), stat.st_size, stat.st_mtime)
+        if key not in self.input_hashes:
+            digest = hashlib.sha256()
+            with open(input_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            self.input_hashes[key] = digest.hexdigest()
+        return self.input_hashes[key]
+    
+    def fingerprint(self, cmd, input_file, repetition=0):
+        """Identify a test by its command, input content, ffmpeg build, host and repetition"""
+        key = {
+            "command": cmd,
+            "input_hash": self.hash_input(input_file),
+            "ffmpeg_version": self.get_ffmpeg_version(),
+            "host": self.get_host()
+        }
+        # First repetitions keep the fingerprint of single-run journals
+        if repetition:
+            key["repetition"] = repetition
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+    
+    def enable_journal(self, resume=False):
+        """Stream results to the journal, optionally loading earlier results to skip"""
+        self.journal = ResultJournal(self.output_dir, self.get_host(), self.run_id)
+        if resume:
+            self.completed = {fp: r for fp, r in self.journal.load().items() if r.get("success", False)}
+            print(f"Resuming: {len(self.completed)} completed tests in {self.journal.path}")
+    
+    def record_result(self, test_result):
+        """Persist a finished (or newly scored) result"""
+        if self.journal:
+            self.journal.append(test_result)
+    
+    def record_input_failure(self, input_file, error):
+        """Record a failed result for an input whose tests could not be prepared"""
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        test_result = {
+            "test_name": f"prepare_{base_name}",
+            "input_file": input_file,
+            "duration": 0,
+            "success": False,
+            "error": str(error),
+            "timestamp": datetime.now().isoformat()
+        }
+        test_result.update(self.input_metadata.get(input_file, {}))
+        self.results.append(test_result)
+        self.record_result(test_result)
+
     def get_system_info(self):
         """Collect system information"""
-        instance_type = self.get_instance_type()
+        self.get_host()
+        instance_type = self.instance_type or None
         return {
             "cpu_count": psutil.cpu_count(),
             "cpu_freq": psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None,
             "memory_total": psutil.virtual_memory().total,
             "architecture": os.uname().machine,
             "platform": os.uname().sysname,
-            "instance_type": instance_type
+            "instance_type": instance_type,
+            "hostname": socket.gethostname(),
+            "ffmpeg_version": self.get_ffmpeg_version(),
+            "ffmpeg_configuration": self.get_ffmpeg_configuration(),
+            "cpu_flags": get_cpu_flags()
         }
     
+    def probe(self, path):
+        """ffprobe format and streams of a file, cached by path, size and modification time"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key in self.probe_cache:
+            self.probe_stats["hits"] += 1
+            return self.probe_cache[key]
+        
+        self.probe_stats["misses"] += 1
+        cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", "-show_streams", path]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        data = json.loads(result.stdout) if result.returncode == 0 else None
+        self.probe_cache[key] = data
+        return data
+    
     def get_video_info(self, video_path):
         """Get video duration and frame rate"""
-        cmd = ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", "-show_streams", video_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
+        data = self.probe(video_path)
+        if data:
             video_stream = next((s for s in data['streams'] if s['codec_type'] == 'video'), None)
             if video_stream:
                 duration = float(data['format']['duration'])
@@ -60,59 +992,99 @@ class FFmpegBenchmark:
                 return duration, fps
         return None, None
     
-    def calculate_vmaf(self, reference_video, encoded_video):
-        """Calculate VMAF score between reference and encoded video"""
-        cmd = [
-            "ffmpeg", "-i", encoded_video, "-i", reference_video,
-            "-lavfi", "libvmaf=log_fmt=json:log_path=/tmp/vmaf.json",
-            "-f", "null", "-"
-        ]
+    def execute(self, cmd, timeout=3600, progress=None, cpus=None, feed=None, read_output=None):
+        """Run a command while sampling its process tree.
         
-        try:
-            subprocess.run(cmd, capture_output=True, text=True, timeout=1800)
-            with open('/tmp/vmaf.json', 'r') as f:
-                vmaf_data = json.load(f)
-                return vmaf_data['pooled_metrics']['vmaf']['mean']
-        except:
-            return None
-    
-    def monitor_resources(self, interval=1):
-        """Monitor CPU and memory usage during encoding"""
-        self.cpu_usage = []
-        self.memory_usage = []
+        The child is reaped with os.wait4 so CPU time, peak RSS, context
+        switches and block I/O come from its exact rusage rather than from
+        sampling. If a progress list is given, ffmpeg writes a -progress
+        stream to a separate pipe and samples are appended to it while the
+        command runs. Output sent to pipe:1 is read and discarded, counting
+        bytes, unless read_output is given to consume stdout instead. feed
+        writes the command's stdin from its own thread. cpus pins the
+        command to the given cores with taskset, which execs the command in
+        place so the pid (and its rusage) stays the encoder's.
+        """
+        start_time = time.time()
+        pass_fds = ()
+        if progress is not None:
+            # Progress gets its own pipe so stdout stays free for the pipe output sink
+            progress_read, progress_write = os.pipe()
+            cmd = cmd[:1] + ["-progress", f"pipe:{progress_write}", "-nostats"] + cmd[1:]
+            pass_fds = (progress_write,)
+        if cpus:
+            # Not a preexec_fn: running Python after fork can deadlock on locks held by scorer and heartbeat threads
+            cmd = ["taskset", "-c", ",".join(str(cpu) for cpu in cpus)] + cmd
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE if feed else None, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, pass_fds=pass_fds)
+        if progress is not None:
+            os.close(progress_write)
+        monitor = ProcessMonitor(proc.pid, self.sample_interval, self.sample_buffer)
+        monitor.start()
+        
+        # Drain output pipes in the background so ffmpeg never blocks on them
+        output = {}
+        def read_stderr():
+            output["stderr"] = proc.stderr.read().decode('utf-8', errors='replace')
+        def read_stdout():
+            if read_output:
+                read_output(proc.stdout)
+            elif cmd[-1] == "pipe:1":
+                output["pipe_bytes"] = sum(len(chunk) for chunk in iter(lambda: proc.stdout.read(1024 * 1024), b''))
+            else:
+                output["stdout"] = proc.stdout.read().decode('utf-8', errors='replace')
+        def read_progress_pipe():
+            with os.fdopen(progress_read, 'r') as stream:
+                read_progress(stream, start_time, progress)
+        
+        readers = [threading.Thread(target=read_stderr), threading.Thread(target=read_stdout)]
+        if progress is not None:
+            readers.append(threading.Thread(target=read_progress_pipe))
+        if feed:
+            readers.append(threading.Thread(target=feed, args=(proc.stdin,)))
+        for reader in readers:
+            reader.start()
+        
+        timed_out = threading.Event()
+        def kill():
+            timed_out.set()
+            proc.kill()
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        
+        _, status, rusage = os.wait4(proc.pid, 0)
+        timer.cancel()
+        proc.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        for reader in readers:
+            reader.join()
+        metrics = monitor.stop(rusage)
+        if "pipe_bytes" in output:
+            metrics["pipe_bytes"] = output["pipe_bytes"]
         
-        while self.monitoring:
-            self.cpu_usage.append(psutil.cpu_percent())
-            self.memory_usage.append(psutil.virtual_memory().percent)
-            time.sleep(interval)
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return subprocess.CompletedProcess(cmd, proc.returncode, output.get("stdout"), output.get("stderr")), metrics
     
-    def run_ffmpeg_command(self, cmd, test_name):
+    def run_ffmpeg_command(self, cmd, test_name, measure_quality=True, reference_file=None, metadata=None, cpus=None):
         """Execute FFmpeg command and collect metrics"""
         print(f"Running test: {test_name}")
         print(f"Command: {' '.join(cmd)}")
         
-        # Start resource monitoring
-        self.monitoring = True
-        monitor_thread = threading.Thread(target=self.monitor_resources)
-        monitor_thread.start()
+        # Progress key/value pairs are collected while the encode runs
+        progress = []
         
         # Record start time
         start_time = time.time()
         
         try:
-            # Run FFmpeg command
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=3600)
+            # Run FFmpeg command with per-process resource accounting
+            result, resources = self.execute(cmd, timeout=3600, progress=progress, cpus=cpus)
             end_time = time.time()
             
-            # Stop monitoring
-            self.monitoring = False
-            monitor_thread.join()
-            
             # Calculate metrics
             duration = end_time - start_time
-            avg_cpu = sum(self.cpu_usage) / len(self.cpu_usage) if self.cpu_usage else 0
-            max_cpu = max(self.cpu_usage) if self.cpu_usage else 0
-            avg_memory = sum(self.memory_usage) / len(self.memory_usage) if self.memory_usage else 0
+            avg_cpu = resources["avg_cpu_usage"]
+            avg_memory = 100 * resources["avg_rss_bytes"] / psutil.virtual_memory().total
             
             # Get input and output files
             input_file = cmd[cmd.index("-i") + 1] if "-i" in cmd else None
@@ -122,123 +1094,1066 @@ class FFmpegBenchmark:
                     output_file = arg
                     break
             
-            file_size = os.path.getsize(output_file) if output_file and os.path.exists(output_file) else 0
+            file_size = os.path.getsize(output_file) if output_file and os.path.exists(output_file) else resources.get("pipe_bytes", 0)
             
             # Calculate real-time factor using output video duration
             output_duration, input_fps = self.get_video_info(output_file) if output_file and os.path.exists(output_file) else (None, None)
+            if output_duration is None and progress and progress[-1].get("out_time"):
+                # Null and pipe sinks leave no file to probe; use the last output timestamp plus one frame
+                input_fps = self.get_video_info(input_file)[1] if input_file else None
+                output_duration = progress[-1]["out_time"] + (1 / input_fps if input_fps else 0)
             real_time_factor = output_duration / duration if output_duration and duration > 0 else None
             
-            # Calculate VMAF if both files exist (limit to same duration)
-            vmaf_score = None
-            if input_file and output_file and os.path.exists(input_file) and os.path.exists(output_file):
-                # For VMAF, we need to compare the same duration segments
-                if output_duration:
-                    # Create temporary input segment matching output duration
-                    temp_input = "/tmp/temp_input_segment.mp4"
-                    segment_cmd = ["ffmpeg", "-y", "-i", input_file, "-t", str(output_duration), "-c", "copy", temp_input]
-                    try:
-                        subprocess.run(segment_cmd, capture_output=True, timeout=300)
-                        vmaf_score = self.calculate_vmaf(temp_input, output_file)
-                        os.remove(temp_input)
-                    except:
-                        pass
+            # Duration limit applied to the input, used to cut the matching reference segment
+            duration_limit = cmd[cmd.index("-t") + 1] if "-t" in cmd else None
             
             test_result = {
                 "test_name": test_name,
                 "command": ' '.join(cmd),
                 "duration": duration,
                 "success": result.returncode == 0,
-                "avg_cpu_usage": avg_cpu,
-                "max_cpu_usage": max_cpu,
                 "avg_memory_usage": avg_memory,
                 "output_file_size": file_size,
                 "video_duration": output_duration,
                 "input_fps": input_fps,
                 "real_time_factor": real_time_factor,
-                "vmaf_score": vmaf_score,
+                "vmaf_score": None,
+                "start_time": start_time,
+                "end_time": end_time,
                 "timestamp": datetime.now().isoformat(),
                 "stderr": result.stderr,
                 "stdout": result.stdout
             }
+            test_result.update(metadata or {})
+            test_result.update(resources)
+            test_result.update(summarize_progress(progress, duration))
+            test_result["progress"] = progress
+            frames = self.estimate_frames(test_result)
+            test_result["cpu_seconds_per_frame"] = resources["cpu_seconds"] / frames if frames else None
             
             self.results.append(test_result)
+            self.record_result(test_result)
             rtf_str = f", RTF: {real_time_factor:.2f}x" if real_time_factor else ""
-            vmaf_str = f", VMAF: {vmaf_score:.1f}" if vmaf_score else ""
-            print(f"Test completed in {duration:.2f}s (CPU: {avg_cpu:.1f}%{rtf_str}{vmaf_str})")
+            fps_str = f", FPS: {test_result['avg_fps']:.1f}" if test_result.get("avg_fps") else ""
+            print(f"Test completed in {duration:.2f}s (CPU: {avg_cpu:.1f}%{rtf_str}{fps_str})")
+            
+            # Queue VMAF scoring off the timed path
+            reference_file = reference_file or input_file
+            if (measure_quality and self.quality_scorer and output_duration and output_file and reference_file and
+                    os.path.exists(reference_file)):
+                self.quality_scorer.submit(test_result, reference_file, output_file, duration_limit, self.record_result)
             return test_result
             
         except subprocess.TimeoutExpired:
-            self.monitoring = False
-            monitor_thread.join()
             print(f"Test {test_name} timed out")
             return None
         except Exception as e:
-            self.monitoring = False
-            monitor_thread.join()
             print(f"Test {test_name} failed: {e}")
             return None
     
-    def run_encoding_tests(self, input_file, duration=None):
-        """Run various encoding tests"""
-        base_name = os.path.splitext(os.path.basename(input_file))[0]
-        
-        # Check input video duration and limit if necessary
+    def resolve_duration(self, input_file, duration):
+        """Check input video duration and drop a limit longer than the video"""
         input_duration, _ = self.get_video_info(input_file)
         if duration and input_duration and duration > input_duration:
             print(f"Warning: Requested duration {duration}s exceeds video length {input_duration:.1f}s. Using full video.")
-            duration = None
-        
-        # Add duration parameter to FFmpeg commands if specified
-        duration_args = ["-t", str(duration)] if duration else []
-        
-        tests = [
-            # H.264 encoding tests
-            {
-                "name": f"h264_1mbps_{base_name}",
-                "cmd": ["ffmpeg", "-y"] + duration_args + ["-i", input_file, "-c:v", "libx264", "-b:v", "1M", "-c:a", "aac", f"output/h264_1m_{base_name}.mp4"]
-            },
-            {
-                "name": f"h264_5mbps_{base_name}",
-                "cmd": ["ffmpeg", "-y"] + duration_args + ["-i", input_file, "-c:v", "libx264", "-b:v", "5M", "-c:a", "aac", f"output/h264_5m_{base_name}.mp4"]
-            },
-            # H.265 encoding tests
-            {
-                "name": f"h265_1mbps_{base_name}",
-                "cmd": ["ffmpeg", "-y"] + duration_args + ["-i", input_file, "-c:v", "libx265", "-b:v", "1M", "-c:a", "aac", f"output/h265_1m_{base_name}.mp4"]
-            },
-            {
-                "name": f"h265_5mbps_{base_name}",
-                "cmd": ["ffmpeg", "-y"] + duration_args + ["-i", input_file, "-c:v", "libx265", "-b:v", "5M", "-c:a", "aac", f"output/h265_5m_{base_name}.mp4"]
-            },
-            # Transcode to different resolutions
-            {
-                "name": f"transcode_720p_{base_name}",
-                "cmd": ["ffmpeg", "-y"] + duration_args + ["-i", input_file, "-vf", "scale=1280:720", "-c:v", "libx265", "-crf", "23", "-c:a", "aac", f"output/720p_{base_name}.mp4"]
-            },
-            {
-                "name": f"transcode_540p_{base_name}",
-                "cmd": ["ffmpeg", "-y"] + duration_args + ["-i", input_file, "-vf", "scale=960:540", "-c:v", "libx265", "-crf", "23", "-c:a", "aac", f"output/540p_{base_name}.mp4"]
-            },
-            {
-                "name": f"transcode_360p_{base_name}",
-                "cmd": ["ffmpeg", "-y"] + duration_args + ["-i", input_file, "-vf", "scale=640:360", "-c:v", "libx265", "-crf", "23", "-c:a", "aac", f"output/360p_{base_name}.mp4"]
+            return None
+        return duration
+    
+    def sink_args(self, output_file):
+        """Output arguments for the configured output sink"""
+        if self.output_sink == "null":
+            return ["-f", "null", "-"]
+        if self.output_sink == "pipe":
+            return ["-f", "matroska", "pipe:1"]
+        return [output_file]
+    
+    def build_test(self, spec, input_file, duration=None, decode_cache=None):
+        """Build the command for one test spec"""
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        output_file = f"output/{spec['output'].format(base_name=base_name)}"
+        if self.output_sink == "tmpfs":
+            output_file = os.path.join(self.tmpfs_dir, os.path.basename(output_file))
+        output_args = self.sink_args(output_file)
+        test = {"name": f"{spec['name']}_{base_name}", "input_file": input_file,
+                "output_file": output_file if self.output_sink in ("disk", "tmpfs") else None,
+                "metadata": dict(spec.get("metadata", {}), output_sink=self.output_sink, input_file=input_file,
+                                 **self.input_metadata.get(input_file, {})),
+                "cpus": spec.get("cpus")}
+        
+        # Read pre-decoded (and pre-scaled) frames so only the encoder is timed, unless the cache has no room for them
+        cached = decode_cache.get(input_file, None, duration) if decode_cache else None
+        scaled = decode_cache.get(input_file, spec["filter"], duration) if cached and spec.get("filter") else None
+        if cached and (scaled or not spec.get("filter")):
+            decoded, decode_seconds = cached
+            source, scale_seconds = scaled or (decoded, 0.0)
+            test["cmd"] = ["ffmpeg", "-y"] + spec.get("global_args", []) + ["-i", source] + spec["video_args"] + ["-an"] + output_args
+            test["reference_file"] = decoded
+            test["metadata"].update({"decode_cache": True, "decode_seconds": decode_seconds, "scale_seconds": scale_seconds})
+        else:
+            # Add duration parameter to FFmpeg commands if specified
+            duration_args = ["-t", str(duration)] if duration else []
+            filter_args = ["-vf", spec["filter"]] if spec.get("filter") else []
+            test["cmd"] = (["ffmpeg", "-y"] + spec.get("global_args", []) + duration_args + ["-i", input_file] + filter_args +
+                           spec["video_args"] + ["-c:a", "aac"] + output_args)
+        return test
+    
+    def build_encoding_tests(self, input_file, duration=None, decode_cache=None):
+        """Build the encoding test matrix for an input file"""
+        duration = self.resolve_duration(input_file, duration)
+        return [self.build_test(spec, input_file, duration, decode_cache) for spec in ENCODING_TESTS]
+    
+    def build_sweep_tests(self, input_file, sweep, duration=None, decode_cache=None):
+        """Expand a codec x preset x threads sweep into tests pinned to matching cores"""
+        duration = self.resolve_duration(input_file, duration)
+        available_cpus = sorted(os.sched_getaffinity(0))
+        tests = []
+        for spec in expand_sweep(sweep, len(available_cpus)):
+            spec["cpus"] = available_cpus[:spec["metadata"]["threads"]]
+            tests.append(self.build_test(spec, input_file, duration, decode_cache))
+        return tests
+    
+    def build_isa_tests(self, input_file, duration=None, decode_cache=None):
+        """Build the encoding test matrix once per supported ISA level below the native one"""
+        duration = self.resolve_duration(input_file, duration)
+        cpu_flags = set(get_cpu_flags())
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        tests = []
+        for level in ISA_LEVELS.get(os.uname().machine, []):
+            if level.get("requires") and level["requires"] not in cpu_flags:
+                print(f"Skipping ISA level {level['name']}: CPU lacks {level['requires']}")
+                continue
+            for spec in ENCODING_TESTS:
+                name = f"{spec['name']}_isa_{level['name']}"
+                tests.append(self.build_test(dict(
+                    spec,
+                    name=name,
+                    output=f"{name}_{{base_name}}.mp4",
+                    global_args=["-cpuflags", level["cpuflags"]],
+                    video_args=isa_video_args(spec["video_args"], level["asm"]),
+                    metadata={"isa_ablation": True, "isa_level": level["name"], "base_test": f"{spec['name']}_{base_name}"}
+                ), input_file, duration, decode_cache))
+        return tests
+    
+    def run_isa_tests(self, input_file, duration=None, decode_cache=None):
+        """Run the test matrix with SIMD restricted to each ISA level"""
+        for test in self.build_isa_tests(input_file, duration, decode_cache):
+            self.run_test(test)
+    
+    def run_encoding_tests(self, input_file, duration=None, decode_cache=None):
+        """Run various encoding tests"""
+        for test in self.build_encoding_tests(input_file, duration, decode_cache):
+            self.run_test(test)
+    
+    def run_sweep_tests(self, input_file, sweep, duration=None, decode_cache=None):
+        """Run a thread-count and preset scaling sweep"""
+        for test in self.build_sweep_tests(input_file, sweep, duration, decode_cache):
+            self.run_test(test)
+    
+    def run_test(self, test):
+        """Run warm-ups and repetitions of one test, skipping repetitions already in the journal"""
+        results = []
+        pending = []
+        for repetition in range(self.repeat):
+            metadata = dict(test["metadata"], repetition=repetition)
+            if self.journal:
+                metadata["fingerprint"] = self.fingerprint(test["cmd"], test["input_file"], repetition)
+                cached = self.completed.get(metadata["fingerprint"])
+                if cached:
+                    print(f"Skipping test: {test['name']} #{repetition + 1} (result from {cached['timestamp']})")
+                    self.results.append(cached)
+                    results.append(cached)
+                    self.rescore(test, cached)
+                    continue
+            pending.append(metadata)
+        
+        # Warm-up runs populate page cache and CPU frequency state and are not recorded
+        if pending:
+            for i in range(self.warmup):
+                print(f"Warm-up run {i + 1}/{self.warmup}: {test['name']}")
+                try:
+                    self.execute(test["cmd"], cpus=test.get("cpus"))
+                except subprocess.TimeoutExpired:
+                    print(f"Warm-up run for {test['name']} timed out")
+        
+        for metadata in pending:
+            # Quality does not change between repetitions, so only score the first
+            result = self.run_ffmpeg_command(test["cmd"], test["name"], measure_quality=metadata["repetition"] == 0,
+                                             reference_file=test.get("reference_file"), metadata=metadata,
+                                             cpus=test.get("cpus"))
+            if result:
+                results.append(result)
+        return results
+    
+    def rescore(self, test, cached):
+        """Queue VMAF for a journaled result whose scoring was lost, e.g. by a crash before the queue was drained"""
+        cmd = test["cmd"]
+        reference_file = test.get("reference_file") or test["input_file"]
+        if (cached.get("repetition", 0) != 0 or cached.get("vmaf_score") is not None or not self.quality_scorer or
+                not test["output_file"] or not os.path.exists(test["output_file"]) or not os.path.exists(reference_file)):
+            return
+        print(f"Re-queueing VMAF for {test['name']}")
+        duration_limit = cmd[cmd.index("-t") + 1] if "-t" in cmd else None
+        self.quality_scorer.submit(cached, reference_file, test["output_file"], duration_limit, self.record_result)
+    
+    def estimate_frames(self, result):
+        """Encoded frame count, measured from progress or estimated from output duration"""
+        if result.get("frames_encoded"):
+            return result["frames_encoded"]
+        if result.get("video_duration") and result.get("input_fps"):
+            return int(round(result["video_duration"] * result["input_fps"]))
+        return 0
+    
+    def run_job_pool(self, job_list, workers):
+        """Run jobs on a process pool with up to `workers` encodes in flight"""
+        # Pool workers come from a fork server, as forking this process can deadlock while QualityScorer threads run
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver")) as executor:
+            futures = [executor.submit(run_concurrent_job, self.output_dir, job["cmd"], job["name"],
+                                       self.sample_interval, self.sample_buffer, job.get("cpus"))
+                       for job in job_list]
+            return [f.result() for f in futures]
+    
+    def serial_baseline(self):
+        """Median duration of each test's successful single-process runs from run_encoding_tests"""
+        serial_durations = {}
+        for r in self.results:
+            if r.get("success", False):
+                serial_durations.setdefault(r["test_name"], []).append(r["duration"])
+        return {name: statistics.median(durations) for name, durations in serial_durations.items()}
+    
+    def run_concurrency_tests(self, input_file, levels, duration=None, decode_cache=None):
+        """Run the test matrix with N encodes in flight for each concurrency level.
+        
+        Level 1 always runs first through the same pool and output paths, and
+        its durations are the serial anchor for the slowdown of higher levels.
+        """
+        tests = self.build_encoding_tests(input_file, duration, decode_cache)
+        baseline = self.serial_baseline()
+        
+        for jobs in sorted(set(levels) | {1}):
+            # Repeat the matrix so that at least N jobs are available to keep N in flight
+            repeats = -(-jobs // len(tests))
+            job_list = []
+            for i in range(repeats * len(tests)):
+                test = tests[i % len(tests)]
+                cmd = test["cmd"]
+                if test["output_file"]:
+                    job_output = os.path.join(os.path.dirname(test["output_file"]), "concurrent",
+                                              f"c{jobs}_j{i}_{os.path.basename(test['output_file'])}")
+                    os.makedirs(os.path.dirname(job_output), exist_ok=True)
+                    cmd = cmd[:-1] + [job_output]
+                job_list.append({"name": test["name"], "cmd": cmd})
+            
+            print(f"\nRunning {len(job_list)} jobs with concurrency {jobs}")
+            job_results = self.run_job_pool(job_list, jobs)
+            
+            completed = [r for r in job_results if r and r.get("success", False)]
+            if not completed:
+                print(f"No jobs completed successfully with concurrency {jobs}")
+                continue
+            
+            if jobs == 1:
+                serial_durations = {}
+                for r in completed:
+                    serial_durations.setdefault(r["test_name"], []).append(r["duration"])
+                baseline = {name: statistics.median(durations) for name, durations in serial_durations.items()}
+            
+            makespan = max(r["end_time"] for r in completed) - min(r["start_time"] for r in completed)
+            total_frames = sum(self.estimate_frames(r) for r in completed)
+            serial_time = sum(baseline.get(r["test_name"], 0) for r in completed)
+            
+            jobs_summary = []
+            for r in completed:
+                job = {k: v for k, v in r.items() if k not in ("stderr", "stdout")}
+                serial_duration = baseline.get(r["test_name"])
+                job["slowdown"] = r["duration"] / serial_duration if serial_duration else None
+                jobs_summary.append(job)
+            slowdowns = [j["slowdown"] for j in jobs_summary if j["slowdown"]]
+            
+            summary = {
+                "input_file": input_file,
+                "concurrency": jobs,
+                "jobs_submitted": len(job_list),
+                "jobs_completed": len(completed),
+                "makespan": makespan,
+                "total_frames": total_frames,
+                "aggregate_fps": total_frames / makespan if makespan > 0 else None,
+                "serial_time": serial_time,
+                "throughput_gain": serial_time / makespan if serial_time and makespan > 0 else None,
+                "avg_job_slowdown": sum(slowdowns) / len(slowdowns) if slowdowns else None,
+                "max_job_slowdown": max(slowdowns) if slowdowns else None,
+                "jobs": jobs_summary
             }
-        ]
+            self.concurrency_results.append(summary)
+            
+            fps_str = f", {summary['aggregate_fps']:.1f} fps aggregate" if summary["aggregate_fps"] else ""
+            slowdown_str = f", {summary['avg_job_slowdown']:.2f}x avg job slowdown" if summary["avg_job_slowdown"] else ""
+            print(f"Concurrency {jobs}: makespan {makespan:.2f}s{fps_str}{slowdown_str}")
+    
+    def count_frames(self, video_path):
+        """Number of video packets in a file"""
+        cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-count_packets",
+               "-show_entries", "stream=nb_read_packets", "-of", "csv=p=0", video_path]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        try:
+            return int(result.stdout.strip().split(',')[0])
+        except ValueError:
+            return None
+    
+    def count_source_frames(self, source, duration_args):
+        """Number of video packets of a source read with the same duration limit as the split"""
+        # framecrc writes one line per packet after its '#' header
+        cmd = ["ffmpeg", "-v", "error"] + duration_args + ["-i", source, "-map", "0:v:0", "-c", "copy", "-f", "framecrc", "-"]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        return sum(1 for line in result.stdout.splitlines() if line and not line.startswith('#'))
+    
+    def run_chunked_test(self, spec, test, chunks, workers, duration=None):
+        """Split one test's input at keyframes, encode the chunks on a worker pool and concat them.
+        
+        When the single-process test encodes audio, the audio track is
+        encoded once as one more pool job and muxed in by the concat step,
+        so both sides of the speedup do the same work.
+        """
+        work_dir = os.path.join("output", "chunked", test["name"])
+        shutil.rmtree(work_dir, ignore_errors=True)
+        os.makedirs(work_dir)
+        decode_cached = test["metadata"].get("decode_cache", False)
+        source = test["cmd"][test["cmd"].index("-i") + 1]
+        duration_args = ["-t", str(duration)] if duration and not decode_cached else []
+        
+        source_duration, fps = self.get_video_info(source)
+        if not source_duration:
+            print(f"Cannot read duration of {source}")
+            return None
+        total_duration = min(duration, source_duration) if duration and not decode_cached else source_duration
+        
+        # Stream copy can only cut at keyframes, so each chunk starts a new GOP
+        print(f"\nSplitting {source} into {chunks} chunks for {test['name']}")
+        split_cmd = (["ffmpeg", "-y"] + duration_args + ["-i", source, "-map", "0:v:0", "-c", "copy", "-f", "segment",
+                     "-segment_time", f"{total_duration / chunks:.3f}", "-reset_timestamps", "1",
+                     os.path.join(work_dir, "source_%03d.nut")])
+        start_time = time.time()
+        split = subprocess.run(split_cmd, capture_output=True, text=True)
+        split_seconds = time.time() - start_time
+        if split.returncode != 0:
+            print(f"Splitting {source} failed: {split.stderr[-500:]}")
+            return None
+        chunk_files = sorted(os.path.join(work_dir, f) for f in os.listdir(work_dir) if f.startswith("source_"))
+        
+        base_name = os.path.splitext(os.path.basename(test["input_file"]))[0]
+        output_file = os.path.join(work_dir, spec["output"].format(base_name=base_name))
+        filter_args = ["-vf", spec["filter"]] if spec.get("filter") and not decode_cached else []
+        job_list = []
+        for i, chunk_file in enumerate(chunk_files):
+            chunk_output = os.path.join(work_dir, f"chunk_{i:03d}_{os.path.basename(output_file)}")
+            cmd = ["ffmpeg", "-y", "-i", chunk_file] + filter_args + spec["video_args"] + ["-an", chunk_output]
+            job_list.append({"name": f"{test['name']}_chunk{i}", "cmd": cmd, "output": chunk_output})
+        
+        audio_output = None
+        data = self.probe(test["input_file"])
+        if "-c:a" in test["cmd"] and data and any(st["codec_type"] == "audio" for st in data["streams"]):
+            audio_output = os.path.join(work_dir, "audio.m4a")
+            audio_cmd = ["ffmpeg", "-y"] + duration_args + ["-i", test["input_file"], "-map", "0:a:0", "-c:a", "aac", audio_output]
+            job_list.append({"name": f"{test['name']}_audio", "cmd": audio_cmd, "output": audio_output})
+        
+        print(f"Encoding {len(chunk_files)} chunks{' and audio' if audio_output else ''} with {workers} workers")
+        job_results = self.run_job_pool(job_list, workers)
+        completed = [r for r in job_results if r and r.get("success", False)]
+        if len(completed) != len(job_list):
+            print(f"{len(job_list) - len(completed)} chunks of {test['name']} failed")
+            return None
+        encode_makespan = max(r["end_time"] for r in completed) - min(r["start_time"] for r in completed)
+        
+        list_file = os.path.join(work_dir, "concat.txt")
+        with open(list_file, 'w') as f:
+            for job in job_list:
+                if job["output"] != audio_output:
+                    f.write(f"file '{os.path.abspath(job['output'])}'\n")
+        audio_args = ["-i", audio_output, "-map", "0:v", "-map", "1:a"] if audio_output else []
+        concat_cmd = (["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_file] + audio_args +
+                      ["-c", "copy", output_file])
+        start_time = time.time()
+        concat = subprocess.run(concat_cmd, capture_output=True, text=True)
+        concat_seconds = time.time() - start_time
+        if concat.returncode != 0:
+            print(f"Concatenating chunks of {test['name']} failed: {concat.stderr[-500:]}")
+            return None
+        
+        # The joined encode must have every frame of the source, read with the same duration limit, and its
+        # duration (within two frames); a segment boundary that drops or repeats frames fails this check
+        chunk_frames = [self.count_frames(chunk_file) or 0 for chunk_file in chunk_files]
+        source_frames = self.count_source_frames(source, duration_args)
+        output_frames = self.count_frames(output_file)
+        output_duration, output_fps = self.get_video_info(output_file)
+        output_data = self.probe(output_file)
+        output_video = next((st for st in output_data["streams"] if st["codec_type"] == "video"), {}) if output_data else {}
+        if output_video.get("duration"):
+            # The muxed audio track can outlast the video by a fraction of a frame
+            output_duration = float(output_video["duration"])
+        frame_time = 1 / (fps or output_fps or 25)
+        expected_duration = source_frames * frame_time if source_frames else None
+        verified = (source_frames is not None and output_frames == source_frames and output_duration is not None and
+                    abs(output_duration - expected_duration) <= 2 * frame_time)
+        
+        chunked_duration = split_seconds + encode_makespan + concat_seconds
+        boundaries = [sum(chunk_frames[:i]) for i in range(1, len(chunk_frames))]
+        return {
+            "input_file": test["input_file"],
+            "test_name": test["name"],
+            "requested_chunks": chunks,
+            "chunks": len(chunk_files),
+            "workers": workers,
+            "split_seconds": split_seconds,
+            "encode_makespan": encode_makespan,
+            "concat_seconds": concat_seconds,
+            "chunked_duration": chunked_duration,
+            "audio": audio_output is not None,
+            "expected_frames": source_frames,
+            "output_frames": output_frames,
+            "expected_duration": expected_duration,
+            "output_duration": output_duration,
+            "verified": verified,
+            "chunk_frames": chunk_frames,
+            "boundaries": boundaries,
+            "output_file": output_file,
+            "jobs": [{k: v for k, v in r.items() if k not in ("stderr", "stdout")} for r in completed]
+        }
+    
+    def run_chunked_tests(self, input_file, chunks, workers=None, duration=None, decode_cache=None):
+        """Run the test matrix as chunked segment-parallel encodes and compare with the single-process runs"""
+        duration = self.resolve_duration(input_file, duration)
+        workers = workers or min(chunks, psutil.cpu_count())
+        baseline = self.serial_baseline()
+        
+        for spec in ENCODING_TESTS:
+            test = self.build_test(spec, input_file, duration, decode_cache)
+            summary = self.run_chunked_test(spec, test, chunks, workers, duration)
+            if not summary:
+                continue
+            
+            single_duration = baseline.get(test["name"])
+            summary["single_duration"] = single_duration
+            summary["speedup"] = single_duration / summary["chunked_duration"] if single_duration else None
+            summary["encode_speedup"] = single_duration / summary["encode_makespan"] if single_duration else None
+            self.chunked_results.append(summary)
+            
+            speedup_str = f", {summary['speedup']:.2f}x vs single process" if summary["speedup"] else ""
+            print(f"Chunked {test['name']}: {summary['chunks']} chunks in {summary['chunked_duration']:.2f}s"
+                  f"{speedup_str}, {'verified' if summary['verified'] else 'FRAME/DURATION MISMATCH'}")
+            
+            # Score both encodes per frame to isolate the quality cost at chunk boundaries
+            single_output = test["output_file"]
+            reference_file = test.get("reference_file") or input_file
+            duration_limit = str(duration) if duration and not test["metadata"].get("decode_cache") else None
+            if (self.quality_scorer and summary["verified"] and summary["boundaries"] and single_output and
+                    os.path.exists(single_output)):
+                self.quality_scorer.submit_boundaries(summary, reference_file, summary["output_file"],
+                                                      single_output, duration_limit)
+    
+    def run_worker(self, client, input_dir, decode_cache=None, retries=5):
+        """Run work units from a coordinator until it reports the campaign finished.
+        
+        Each unit is one test on one input; its results (VMAF included) are
+        sent back as soon as the unit completes.
+        """
+        client.start(self.get_system_info())
+        print(f"Worker {client.worker_id} (group {client.group}) connected to {client.url}")
+        failures = 0
+        try:
+            while True:
+                try:
+                    response = client.post("/next", {})
+                    failures = 0
+                except (urllib.error.URLError, OSError) as e:
+                    failures += 1
+                    if failures > retries:
+                        print(f"Coordinator unreachable, stopping: {e}")
+                        return
+                    time.sleep(client.heartbeat_interval)
+                    continue
+                
+                if response.get("done"):
+                    print("Coordinator reports all work finished")
+                    return
+                if response.get("register"):
+                    client.register(client.system_info)
+                    continue
+                if not response.get("unit"):
+                    time.sleep(response.get("wait", client.heartbeat_interval))
+                    continue
+                
+                unit = response["unit"]
+                print(f"\nWork unit {unit['unit_id']}")
+                report = {"unit_id": unit["unit_id"], "run_id": self.run_id, "run_timestamp": self.run_timestamp,
+                          "system_info": client.system_info, "benchmark_results": [], "success": False}
+                try:
+                    input_file = os.path.join(input_dir, unit["input_file"])
+                    spec = next(spec for spec in ENCODING_TESTS if spec["name"] == unit["test"])
+                    self.repeat = unit.get("repeat") or self.repeat
+                    test = self.build_test(spec, input_file, self.resolve_duration(input_file, unit.get("duration")),
+                                           decode_cache)
+                    results = self.run_test(test)
+                    if self.quality_scorer:
+                        self.quality_scorer.drain()
+                    report["benchmark_results"] = [{k: v for k, v in r.items() if k not in ("stderr", "stdout")}
+                                                   for r in results]
+                    report["success"] = bool(results) and all(r.get("success", False) for r in results)
+                    if not report["success"]:
+                        report["error"] = "encode failed"
+                except Exception as e:
+                    report["error"] = str(e)
+                    print(f"Work unit {unit['unit_id']} failed: {e}")
+                
+                try:
+                    client.post("/result", report, timeout=120)
+                except (urllib.error.URLError, OSError) as e:
+                    print(f"Could not send results of {unit['unit_id']}: {e}")
+        finally:
+            client.stop()
+    
+    def build_quality_sample(self, input_file, duration=None):
+        """Cut evenly spaced short segments of an input into one raw y4m sample, cached by input content"""
+        input_duration, _ = self.get_video_info(input_file)
+        if not input_duration:
+            raise RuntimeError(f"Cannot read duration of {input_file}")
+        total = min(duration, input_duration) if duration else input_duration
+        length = min(QUALITY_SAMPLE_SECONDS, total / QUALITY_SAMPLE_SEGMENTS)
+        starts = [round(i * (total - length) / max(QUALITY_SAMPLE_SEGMENTS - 1, 1), 3) for i in range(QUALITY_SAMPLE_SEGMENTS)]
         
-        for test in tests:
-            self.run_ffmpeg_command(test["cmd"], test["name"])
+        work_dir = os.path.join("output", "quality_search")
+        os.makedirs(work_dir, exist_ok=True)
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        digest = hashlib.sha1(f"{self.hash_input(input_file)}|{starts}|{length}".encode()).hexdigest()[:12]
+        sample = os.path.join(work_dir, f"{base_name}_{digest}.y4m")
+        if not os.path.exists(sample):
+            selection = "+".join(f"between(t,{start},{start + length})" for start in starts)
+            cmd = ["ffmpeg", "-y", "-i", input_file, "-map", "0:v:0", "-vf", f"select='{selection}',setpts=N/FRAME_RATE/TB",
+                   "-f", "yuv4mpegpipe", "-strict", "-1", sample + ".tmp"]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"Failed to cut quality sample of {input_file}: {result.stderr[-500:]}")
+            os.rename(sample + ".tmp", sample)
+        return sample, {"starts": starts, "length": length}
+    
+    def load_quality_cache(self):
+        path = os.path.join(self.output_dir, "quality_search_cache.json")
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+        return {}
+    
+    def save_quality_cache(self, cache):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, "quality_search_cache.json")
+        with open(path + ".tmp", 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(path + ".tmp", path)
+    
+    def rate_args(self, mode, value):
+        if mode == "crf":
+            return ["-crf", str(value)]
+        return ["-b:v", f"{value}k", "-maxrate", f"{value}k", "-bufsize", f"{2 * value}k"]
+    
+    def probe_quality(self, sample, cache, key_base, codec, preset, mode, value, n_subsample):
+        """Encode the sample at one setting and score it, reusing cached scores"""
+        key = hashlib.sha1(json.dumps(dict(key_base, codec=codec, preset=preset, mode=mode, value=value,
+                                           n_subsample=n_subsample), sort_keys=True).encode()).hexdigest()
+        if key in cache:
+            return dict(cache[key], cached=True)
+        
+        encoded = os.path.splitext(sample)[0] + f"_{codec}_{preset}_{mode}{value}.mp4"
+        cmd = ["ffmpeg", "-y", "-i", sample, "-c:v", codec, "-preset", preset] + self.rate_args(mode, value) + ["-an", encoded]
+        start_time = time.time()
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        encode_seconds = time.time() - start_time
+        if result.returncode != 0:
+            raise RuntimeError(f"Probe encode {codec} {mode}={value} failed: {result.stderr[-500:]}")
+        
+        vmaf = self.quality_scorer.calculate_vmaf(sample, encoded, n_subsample=n_subsample)
+        if vmaf is None:
+            raise RuntimeError(f"VMAF of probe encode {codec} {mode}={value} failed")
+        cache[key] = {"value": value, "vmaf": vmaf, "encode_seconds": encode_seconds,
+                      "size_bytes": os.path.getsize(encoded)}
+        self.save_quality_cache(cache)
+        return dict(cache[key], cached=False)
+    
+    def search_rate(self, probe, mode, low, high, target):
+        """Bisect a rate setting for the cheapest one that reaches the target VMAF.
+        
+        VMAF falls as CRF rises and rises with bitrate, so the search keeps a
+        passing and a failing bound and narrows them until adjacent.
+        """
+        if mode == "crf":
+            best, worst = low, high
+            if probe(worst)["vmaf"] >= target:
+                return worst
+            if probe(best)["vmaf"] < target:
+                return None
+            while worst - best > 1:
+                middle = (best + worst) // 2
+                if probe(middle)["vmaf"] >= target:
+                    best = middle
+                else:
+                    worst = middle
+            return best
+        
+        best, worst = high, low
+        if probe(worst)["vmaf"] >= target:
+            return worst
+        if probe(best)["vmaf"] < target:
+            return None
+        while best / worst > 1.05:
+            middle = int(round((best * worst) ** 0.5))
+            if probe(middle)["vmaf"] >= target:
+                best = middle
+            else:
+                worst = middle
+        return best
+    
+    def run_quality_search(self, input_file, target, mode="crf", codecs=None, preset="medium", n_subsample=5,
+                           duration=None, decode_cache=None):
+        """Find the cheapest CRF or bitrate reaching a target VMAF per codec, then time a full encode with it"""
+        if not self.quality_scorer:
+            print("Quality search needs a VMAF scorer")
+            return
+        duration = self.resolve_duration(input_file, duration)
+        try:
+            sample, sample_info = self.build_quality_sample(input_file, duration)
+        except RuntimeError as e:
+            print(e)
+            return
+        cache = self.load_quality_cache()
+        key_base = {"input_hash": self.hash_input(input_file), "sample": sample_info,
+                    "ffmpeg_version": self.get_ffmpeg_version()}
+        
+        for codec in codecs or list(QUALITY_SEARCH_RANGES):
+            if codec not in QUALITY_SEARCH_RANGES:
+                print(f"No quality search range for {codec}")
+                continue
+            low, high = QUALITY_SEARCH_RANGES[codec][mode]
+            steps = []
+            def probe(value):
+                step = self.probe_quality(sample, cache, key_base, codec, preset, mode, value, n_subsample)
+                steps.append(step)
+                print(f"Quality search {codec} {mode}={value}: VMAF {step['vmaf']:.2f}{' (cached)' if step['cached'] else ''}")
+                return step
+            
+            print(f"\nSearching {mode} for VMAF {target} with {codec} ({preset}) on {input_file}")
+            start_time = time.time()
+            try:
+                value = self.search_rate(probe, mode, low, high, target)
+            except RuntimeError as e:
+                print(e)
+                continue
+            summary = {
+                "input_file": input_file,
+                "codec": codec,
+                "preset": preset,
+                "rate_control": mode,
+                "target_vmaf": target,
+                "reachable": value is not None,
+                "rate_value": value,
+                "sample_vmaf": next((st["vmaf"] for st in reversed(steps) if st["value"] == value), None),
+                "probes": len(steps),
+                "cached_probes": sum(1 for st in steps if st["cached"]),
+                "search_seconds": time.time() - start_time,
+                "n_subsample": n_subsample,
+                "steps": steps
+            }
+            self.quality_search_results.append(summary)
+            if value is None:
+                print(f"VMAF {target} not reachable with {codec} in {mode} range {low}-{high}")
+                continue
+            
+            # Time the converged setting on the full input like any other test
+            name = f"qsearch_{codec}_{mode}"
+            spec = {"name": name, "output": f"{name}_{{base_name}}.mp4",
+                    "video_args": ["-c:v", codec, "-preset", preset] + self.rate_args(mode, value),
+                    "metadata": {"quality_search": True, "codec": codec, "preset": preset, "rate_control": mode,
+                                 "rate_value": value, "target_vmaf": target}}
+            results = [r for r in self.run_test(self.build_test(spec, input_file, duration, decode_cache)) if r.get("success", False)]
+            if results:
+                summary["test_name"] = results[0]["test_name"]
+                summary["encode_duration"] = statistics.median(r["duration"] for r in results)
+                summary["video_duration"] = results[0].get("video_duration")
+                print(f"{codec} reaches VMAF {target} at {mode}={value}: {summary['encode_duration']:.2f}s encode")
+    
+    def build_latency_sample(self, input_file, filter_chain, seconds):
+        """Decode, scale and resample an input to raw y4m frames at the latency test rate, cached by input content"""
+        work_dir = os.path.join("output", "latency")
+        os.makedirs(work_dir, exist_ok=True)
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        digest = hashlib.sha1(f"{self.hash_input(input_file)}|{filter_chain}|{LATENCY_FPS}|{seconds}".encode()).hexdigest()[:12]
+        sample = os.path.join(work_dir, f"{base_name}_{digest}.y4m")
+        if not os.path.exists(sample):
+            # Short inputs are looped to fill the window
+            cmd = ["ffmpeg", "-y", "-stream_loop", "-1", "-i", input_file, "-t", str(seconds), "-map", "0:v:0",
+                   "-vf", f"fps={LATENCY_FPS},{filter_chain}", "-pix_fmt", "yuv420p", "-f", "yuv4mpegpipe", sample + ".tmp"]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"Failed to build latency sample of {input_file}: {result.stderr[-500:]}")
+            os.rename(sample + ".tmp", sample)
+        return sample
+    
+    def run_latency_test(self, spec, input_file, seconds, repetition=0):
+        """Feed raw frames to a low-latency encode at a fixed rate and time each frame's arrival on the output pipe"""
+        sample = self.build_latency_sample(input_file, spec["filter"], seconds)
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        test_name = f"{spec['name']}_{base_name}"
+        bitrate = spec["bitrate"]
+        cmd = (["ffmpeg", "-y", "-f", "yuv4mpegpipe", "-i", "pipe:0"] + spec["video_args"] +
+               ["-b:v", str(bitrate), "-maxrate", str(bitrate), "-bufsize", str(bitrate // LATENCY_FPS),
+                "-g", str(2 * LATENCY_FPS), "-an", "-flush_packets", "1", "-f", spec["format"], "pipe:1"])
+        print(f"Running test: {test_name}")
+        print(f"Command: {' '.join(cmd)}")
+        
+        scheduled = []
+        arrivals = []
+        def feed(stdin):
+            # Frame i is due at start + i / fps, as if it came from a live source
+            try:
+                with open(sample, 'rb') as f:
+                    header = f.readline()
+                    fields = {field[0]: field[1:] for field in header.decode().split()[1:]}
+                    frame_size = len(b"FRAME\n") + int(fields["W"]) * int(fields["H"]) * 3 // 2
+                    stdin.write(header)
+                    start = time.time()
+                    while True:
+                        frame = f.read(frame_size)
+                        if len(frame) < frame_size:
+                            break
+                        due = start + len(scheduled) / LATENCY_FPS
+                        if due > time.time():
+                            time.sleep(due - time.time())
+                        scheduled.append(due)
+                        stdin.write(frame)
+                        stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                print(f"Feeding {test_name} stopped: {e}")
+            finally:
+                try:
+                    stdin.close()
+                except OSError:
+                    pass
+        
+        start_time = time.time()
+        try:
+            result, resources = self.execute(cmd, timeout=max(60, 10 * seconds), feed=feed,
+                                             read_output=lambda stream: read_access_units(stream, AUD_START_CODES[spec["format"]], arrivals))
+        except subprocess.TimeoutExpired:
+            print(f"Test {test_name} timed out")
+            return None
+        end_time = time.time()
+        duration = end_time - start_time
+        
+        frames = min(len(arrivals), len(scheduled))
+        latencies = [arrivals[i] - scheduled[i] for i in range(frames)]
+        budget = 1 / LATENCY_FPS
+        test_result = {
+            "test_name": test_name,
+            "command": ' '.join(cmd),
+            "duration": duration,
+            "success": result.returncode == 0 and frames > 0 and len(arrivals) == len(scheduled),
+            "frames_encoded": frames,
+            "input_fps": LATENCY_FPS,
+            "video_duration": frames / LATENCY_FPS,
+            "real_time_factor": frames / LATENCY_FPS / duration if duration > 0 else None,
+            "output_file_size": resources.get("pipe_bytes", 0),
+            "vmaf_score": None,
+            "time_to_first_packet": arrivals[0] - start_time if arrivals else None,
+            "latency_p50": percentile(latencies, 50) if latencies else None,
+            "latency_p99": percentile(latencies, 99) if latencies else None,
+            "latency_max": max(latencies) if latencies else None,
+            "latency_mean": statistics.mean(latencies) if latencies else None,
+            # Mean change in latency between consecutive frames (RFC 3550 interarrival jitter, unsmoothed)
+            "jitter": statistics.mean(abs(b - a) for a, b in zip(latencies, latencies[1:])) if frames > 1 else None,
+            "frames_over_budget": sum(1 for latency in latencies if latency > budget),
+            "frame_latencies": [round(latency, 5) for latency in latencies],
+            "start_time": start_time,
+            "end_time": end_time,
+            "timestamp": datetime.now().isoformat(),
+            "stderr": result.stderr
+        }
+        test_result.update({"latency": True, "codec": spec["video_args"][spec["video_args"].index("-c:v") + 1],
+                            "output_sink": "pipe", "repetition": repetition})
+        test_result.update(self.input_metadata.get(input_file, {}))
+        test_result.update(resources)
+        test_result["cpu_seconds_per_frame"] = resources["cpu_seconds"] / frames if frames else None
+        
+        self.results.append(test_result)
+        self.record_result(test_result)
+        if latencies:
+            print(f"Test completed: first packet after {test_result['time_to_first_packet'] * 1000:.1f} ms, "
+                  f"frame latency p50 {test_result['latency_p50'] * 1000:.1f} ms, p99 {test_result['latency_p99'] * 1000:.1f} ms, "
+                  f"max {test_result['latency_max'] * 1000:.1f} ms, jitter {(test_result['jitter'] or 0) * 1000:.2f} ms")
+        else:
+            print(f"Test {test_name} produced no frames")
+        return test_result
+    
+    def run_latency_tests(self, input_file, seconds=LATENCY_SECONDS, duration=None):
+        """Run the low-latency live encoding tests"""
+        if duration:
+            seconds = min(seconds, duration)
+        for spec in LATENCY_TESTS:
+            for repetition in range(self.repeat):
+                try:
+                    self.run_latency_test(spec, input_file, seconds, repetition)
+                except RuntimeError as e:
+                    print(f"Test {spec['name']} failed: {e}")
+    
+    def build_batch_clips(self, input_file, count, source):
+        """Cut an input into short video clips or WAV audio snippets in one segmenting pass, cached by input content"""
+        if not any(stream['codec_type'] == source for stream in (self.probe(input_file) or {}).get('streams', [])):
+            return []
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        digest = hashlib.sha1(f"{self.hash_input(input_file)}|{source}|{BATCH_CLIP_SECONDS}".encode()).hexdigest()[:12]
+        clip_dir = os.path.join("output", "batch", "source", f"{base_name}_{source}_{digest}")
+        ext = "mp4" if source == "video" else "wav"
+        clips = sorted(os.path.join(clip_dir, f) for f in os.listdir(clip_dir)) if os.path.isdir(clip_dir) else []
+        
+        if len(clips) < count:
+            shutil.rmtree(clip_dir, ignore_errors=True)
+            os.makedirs(clip_dir)
+            # Short inputs are looped until there are enough clips; one spare covers a short last segment
+            if source == "video":
+                codec_args = ["-map", "0:v:0", "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+                              "-force_key_frames", f"expr:gte(t,n_forced*{BATCH_CLIP_SECONDS})"]
+            else:
+                codec_args = ["-map", "0:a:0", "-c:a", "pcm_s16le"]
+            cmd = (["ffmpeg", "-y", "-stream_loop", "-1", "-i", input_file, "-t", str((count + 1) * BATCH_CLIP_SECONDS)] +
+                   codec_args + ["-f", "segment", "-segment_time", str(BATCH_CLIP_SECONDS), "-reset_timestamps", "1",
+                                 os.path.join(clip_dir, f"clip_%05d.{ext}")])
+            print(f"Cutting {count} {source} clips from {input_file}")
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"Failed to cut batch clips of {input_file}: {result.stderr[-500:]}")
+            clips = sorted(os.path.join(clip_dir, f) for f in os.listdir(clip_dir))
+        return clips[:count]
+    
+    def batch_commands(self, task, clips, output_dir, batch_size):
+        """ffmpeg commands running a task on clips, with up to batch_size inputs and outputs per invocation"""
+        stream = "v" if task["source"] == "video" else "a"
+        commands = []
+        for i in range(0, len(clips), batch_size):
+            batch = clips[i:i + batch_size]
+            cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+            for clip in batch:
+                cmd += task["input_args"] + ["-i", clip]
+            for j, clip in enumerate(batch):
+                output_file = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(clip))[0]}.{task['ext']}")
+                cmd += ["-map", f"{j}:{stream}:0"] + task["output_args"] + [output_file]
+            commands.append(cmd)
+        return commands
+    
+    def measure_startup(self, runs=10):
+        """Median wall time of starting ffmpeg and exiting without doing any work"""
+        durations = []
+        for _ in range(runs):
+            start_time = time.time()
+            subprocess.run(["ffmpeg", "-hide_banner", "-version"], capture_output=True)
+            durations.append(time.time() - start_time)
+        return statistics.median(durations)
+    
+    def run_batch_mode(self, task, clips, mode, workers, batch_size, pool=None):
+        """Run a task over clips in one batch mode and count the outputs it produced"""
+        output_dir = os.path.join("output", "batch", task["name"], mode)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(output_dir)
+        commands = self.batch_commands(task, clips, output_dir, batch_size)
+        
+        start_time = time.time()
+        if pool:
+            results = list(pool.map(run_batch_command, commands))
+        else:
+            results = [run_batch_command(cmd) for cmd in commands]
+        wall_seconds = time.time() - start_time
+        
+        # Outputs are checked by size; probing hundreds of small files would cost more than the encodes
+        outputs = sum(1 for f in os.listdir(output_dir) if os.path.getsize(os.path.join(output_dir, f)) > 0)
+        failed = [r for r in results if r["returncode"] != 0]
+        if failed:
+            print(f"{len(failed)} {mode} invocations of {task['name']} failed: {failed[0]['stderr'].strip()[-300:]}")
+        return {
+            "task": task["name"],
+            "source": task["source"],
+            "mode": mode,
+            "files": len(clips),
+            "workers": workers if pool else 1,
+            "batch_size": batch_size,
+            "invocations": len(commands),
+            "failed_invocations": len(failed),
+            "outputs": outputs,
+            "wall_seconds": wall_seconds,
+            "files_per_second": outputs / wall_seconds if wall_seconds > 0 else None,
+            "seconds_per_file": wall_seconds / outputs if outputs else None
+        }
+    
+    def run_batch_tests(self, input_file, counts=BATCH_FILE_COUNTS, tasks=None, workers=None, batch_size=BATCH_SIZE):
+        """Compare one process per file, batched invocations and a pre-forked pool on many short clips"""
+        tasks = [task for task in BATCH_TASKS if not tasks or task["name"] in tasks]
+        workers = workers or psutil.cpu_count()
+        startup_seconds = self.measure_startup()
+        print(f"\nffmpeg start-up: {startup_seconds * 1000:.1f} ms")
+        
+        # Start the pool workers before timing so the pool modes only pay for the ffmpeg processes; they come
+        # from a fork server, as forking this process can deadlock while QualityScorer threads run
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver")) as pool:
+            list(pool.map(worker_ready, range(workers)))
+            for count in counts:
+                for task in tasks:
+                    try:
+                        clips = self.build_batch_clips(input_file, count, task["source"])
+                    except RuntimeError as e:
+                        print(e)
+                        continue
+                    if not clips:
+                        print(f"Skipping {task['name']}: {input_file} has no {task['source']} stream")
+                        continue
+                    
+                    for repetition in range(self.repeat):
+                        seconds_per_file = {}
+                        for mode in BATCH_MODES:
+                            size = 1
+                            if mode == "batched":
+                                size = batch_size
+                            elif mode == "pool_batched":
+                                # Spread the clips over every worker
+                                size = max(1, min(batch_size, -(-len(clips) // workers)))
+                            print(f"Batch {task['name']}: {len(clips)} files, {mode} (batch size {size})")
+                            summary = self.run_batch_mode(task, clips, mode, workers, size,
+                                                          pool if mode.startswith("pool") else None)
+                            summary.update({"input_file": input_file, "repetition": repetition,
+                                            "startup_seconds": startup_seconds})
+                            self.batch_results.append(summary)
+                            seconds_per_file[mode] = summary["seconds_per_file"]
+                            if summary["files_per_second"]:
+                                print(f"  {summary['files_per_second']:.1f} files/s, "
+                                      f"{summary['seconds_per_file'] * 1000:.1f} ms per file")
+                        
+                        if seconds_per_file.get("per_file") and seconds_per_file.get("batched"):
+                            overhead = seconds_per_file["per_file"] - seconds_per_file["batched"]
+                            print(f"Spawn overhead per file for {task['name']}: {overhead * 1000:.1f} ms")
+    
+    def run_density_trial(self, input_file, channels, window=30, min_speed=0.99, pin=False):
+        """Run K paced live transcodes at once and check every one keeps up in real time"""
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        available_cpus = sorted(os.sched_getaffinity(0))
+        
+        job_list = []
+        for i in range(channels):
+            cpus = None
+            if pin:
+                # Split cores evenly between channels, or round-robin single cores once channels outnumber them
+                if channels <= len(available_cpus):
+                    per_channel = len(available_cpus) // channels
+                    cpus = available_cpus[i * per_channel:(i + 1) * per_channel]
+                else:
+                    cpus = [available_cpus[i % len(available_cpus)]]
+            # -re paces input at its native frame rate; looping keeps short inputs live for the whole window
+            cmd = (["ffmpeg", "-y", "-re", "-stream_loop", "-1", "-i", input_file, "-t", str(window)] +
+                   (["-vf", DENSITY_TEST["filter"]] if DENSITY_TEST.get("filter") else []) +
+                   DENSITY_TEST["video_args"] + ["-c:a", "aac", "-f", "null", "-"])
+            job_list.append({"name": f"density_{base_name}_k{channels}_ch{i}", "cmd": cmd, "cpus": cpus})
+        
+        print(f"\nDensity trial: {channels} live channels for {window}s")
+        job_results = self.run_job_pool(job_list, channels)
+        
+        streams = []
+        for job, r in zip(job_list, job_results):
+            speed = r.get("steady_state_speed") if r else None
+            dropped = r.get("dropped_frames", 0) if r else None
+            streams.append({
+                "name": job["name"],
+                "cpus": job["cpus"],
+                "success": bool(r and r.get("success", False)),
+                "steady_state_speed": speed,
+                "dropped_frames": dropped,
+                "avg_cpu_usage": r.get("avg_cpu_usage") if r else None
+            })
+        speeds = [st["steady_state_speed"] for st in streams if st["steady_state_speed"] is not None]
+        passed = (len(speeds) == channels and all(st["success"] for st in streams) and
+                  min(speeds) >= min_speed and all(st["dropped_frames"] == 0 for st in streams))
+        
+        min_str = f"min speed {min(speeds):.3f}x" if speeds else "no speed data"
+        print(f"Density trial {channels} channels: {'PASS' if passed else 'FAIL'} ({min_str})")
+        return {"channels": channels, "passed": passed, "min_speed": min(speeds) if speeds else None, "streams": streams}
+    
+    def run_density_search(self, input_file, window=30, min_speed=0.99, pin=False, max_channels=None):
+        """Find the maximum number of concurrent real-time channels by exponential then binary search"""
+        max_channels = max_channels or 4 * psutil.cpu_count()
+        trials = {}
+        
+        def trial(channels):
+            if channels not in trials:
+                trials[channels] = self.run_density_trial(input_file, channels, window, min_speed, pin)
+            return trials[channels]["passed"]
+        
+        # Double the channel count until a trial fails
+        best, failed = 0, None
+        channels = 1
+        while channels <= max_channels:
+            if trial(channels):
+                best = channels
+                channels *= 2
+            else:
+                failed = channels
+                break
+        if failed is None and best < max_channels:
+            failed = max_channels + 1 if trial(max_channels) else max_channels
+            best = max_channels if failed > max_channels else best
+        
+        # Binary search between the last passing and first failing count
+        while failed is not None and failed - best > 1:
+            middle = (best + failed) // 2
+            if trial(middle):
+                best = middle
+            else:
+                failed = middle
+        
+        summary = {
+            "input_file": input_file,
+            "test": DENSITY_TEST["name"],
+            "window": window,
+            "min_speed_threshold": min_speed,
+            "pinned": pin,
+            "max_channels": best,
+            "trials": [trials[k] for k in sorted(trials)]
+        }
+        self.density_results.append(summary)
+        print(f"Maximum sustained live channels for {input_file}: {best}")
+        return summary
     
     def save_results(self):
         """Save benchmark results to JSON file"""
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # Wait for outstanding quality scores
+        if self.quality_scorer:
+            self.quality_scorer.drain()
+        
         # Add system info to results
         final_results = {
+            "run_id": self.run_id,
+            "run_timestamp": self.run_timestamp,
             "system_info": self.get_system_info(),
             "benchmark_results": self.results,
             "total_tests": len(self.results),
             "successful_tests": len([r for r in self.results if r.get("success", False)])
         }
+        if self.concurrency_results:
+            final_results["concurrency_results"] = self.concurrency_results
+        if self.density_results:
+            final_results["density_results"] = self.density_results
+        if self.chunked_results:
+            final_results["chunked_results"] = self.chunked_results
+        if self.quality_search_results:
+            final_results["quality_search_results"] = self.quality_search_results
+        if self.batch_results:
+            final_results["batch_results"] = self.batch_results
+        final_results["probe_cache"] = dict(self.probe_stats)
+        if self.journal:
+            final_results["journal"] = self.journal.path
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         arch = os.uname().machine
@@ -250,20 +2165,120 @@ class FFmpegBenchmark:
         print(f"Results saved to: {filename}")
         return filename
 
+def run_concurrent_job(output_dir, cmd, test_name, sample_interval=0.1, sample_buffer=600, cpus=None):
+    """Run a single encode in a pool worker with its own timing and resource accounting"""
+    benchmark = FFmpegBenchmark(output_dir, sample_interval=sample_interval, sample_buffer=sample_buffer)
+    return benchmark.run_ffmpeg_command(cmd, test_name, measure_quality=False, cpus=cpus)
+
+def run_batch_command(cmd):
+    """Run one batch ffmpeg invocation, timed by wall clock only"""
+    start_time = time.time()
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return {"returncode": result.returncode, "start_time": start_time, "end_time": time.time(),
+            "stderr": result.stderr if result.returncode != 0 else ""}
+
+def worker_ready(_):
+    """No-op used to start every pool worker before a timed batch"""
+    return os.getpid()
+
+def parse_concurrency_levels(jobs, concurrency):
+    """Combine --jobs and --concurrency into a sorted list of concurrency levels"""
+    levels = set()
+    if jobs:
+        levels.add(jobs)
+    if concurrency:
+        levels.update(int(level) for level in concurrency.split(',') if level.strip())
+    return sorted(levels)
+
 def main():
     parser = argparse.ArgumentParser(description='FFmpeg Benchmark Runner')
-    parser.add_argument('--input-dir', default='input', help='Input directory with test files')
+    parser.add_argument('--input-dir', default='input',
+                        help='Input directory with test files, or a corpus manifest from build-corpus.py')
     parser.add_argument('--output-dir', default='results', help='Output directory for results')
     parser.add_argument('--duration', type=int, help='Duration in seconds to process (default: full video)')
+    parser.add_argument('--jobs', type=int, help='Also run the test matrix with N parallel encodes')
+    parser.add_argument('--concurrency', help='Comma-separated concurrency levels to run, e.g. 1,2,4,8')
+    parser.add_argument('--vmaf-workers', type=int, default=1, help='Number of parallel VMAF scoring jobs')
+    parser.add_argument('--vmaf-threads', type=int, help='libvmaf n_threads per scoring job (default: CPU count)')
+    parser.add_argument('--vmaf-subsample', type=int, help='Score every Nth frame (libvmaf n_subsample)')
+    parser.add_argument('--vmaf-overlap', action='store_true',
+                        help='Start VMAF scoring while encodes are still running (faster, but shares cores with timed encodes)')
+    parser.add_argument('--output-sink', choices=OUTPUT_SINKS, default='disk',
+                        help='Where encodes write output: output/ on disk, tmpfs, the null muxer, or a discarded pipe')
+    parser.add_argument('--tmpfs-dir', default='/dev/shm/ffmpeg-bench-output', help='Output directory for the tmpfs sink')
+    parser.add_argument('--decode-cache', action='store_true',
+                        help='Decode and scale each input once to raw frames so tests time the encoder only')
+    parser.add_argument('--cache-dir', default='/dev/shm/ffmpeg-bench-cache', help='Directory for decoded frame cache')
+    parser.add_argument('--sweep', nargs='?', const='default',
+                        help='Run a codec x preset x threads scaling sweep (optionally from a JSON sweep file)')
+    parser.add_argument('--quality-search', type=float, metavar='VMAF',
+                        help='Search the cheapest CRF or bitrate reaching this VMAF per codec and time it')
+    parser.add_argument('--quality-search-mode', choices=['crf', 'bitrate'], default='crf', help='Rate control to search')
+    parser.add_argument('--quality-search-codecs', default=','.join(QUALITY_SEARCH_RANGES),
+                        help='Comma-separated codecs to search')
+    parser.add_argument('--quality-search-preset', default='medium', help='Encoder preset for the search')
+    parser.add_argument('--quality-search-subsample', type=int, default=5,
+                        help='Score every Nth frame of the search probes (libvmaf n_subsample)')
+    parser.add_argument('--isa-ablation', action='store_true',
+                        help='Also run the test matrix with SIMD limited to each ISA level (-cpuflags and x264/x265 asm)')
+    parser.add_argument('--latency', action='store_true',
+                        help='Run low-latency live encodes fed at a fixed frame rate and measure per-frame latency')
+    parser.add_argument('--latency-seconds', type=int, default=LATENCY_SECONDS, help='Seconds of video per latency test')
+    parser.add_argument('--batch', nargs='?', const=','.join(str(n) for n in BATCH_FILE_COUNTS),
+                        help='Run the small-file batch benchmark for comma-separated file counts (default: 10,50,100,500)')
+    parser.add_argument('--batch-tasks', help=f'Comma-separated batch tasks (default: {",".join(t["name"] for t in BATCH_TASKS)})')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Files per ffmpeg invocation in batched modes')
+    parser.add_argument('--batch-workers', type=int, help='Pre-forked pool workers for the pool modes (default: CPU count)')
+    parser.add_argument('--density', action='store_true',
+                        help='Search for the maximum number of concurrent real-time 1080p to 720p live channels')
+    parser.add_argument('--density-window', type=int, default=30, help='Seconds each density trial runs')
+    parser.add_argument('--density-min-speed', type=float, default=0.99,
+                        help='Minimum steady-state speed for a channel to count as real-time (tolerates -re pacing jitter)')
+    parser.add_argument('--density-pin', action='store_true', help='Pin density channels to separate cores')
+    parser.add_argument('--density-max', type=int, help='Upper bound for the channel search (default: 4x CPU count)')
+    parser.add_argument('--chunked', type=int, metavar='N',
+                        help='Also encode each test as N keyframe-aligned chunks in parallel and concat them')
+    parser.add_argument('--chunk-workers', type=int, help='Parallel chunk encodes (default: min(N, CPU count))')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of measured runs per test')
+    parser.add_argument('--warmup', type=int, default=0, help='Number of unrecorded warm-up runs per test')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip tests that already have a successful result in the results journal')
+    parser.add_argument('--worker', metavar='URL', help='Run work units from a benchmark-coordinator.py at URL')
+    parser.add_argument('--worker-group', help='Worker group to join (default: the EC2 instance type, else the hostname)')
+    parser.add_argument('--sample-interval', type=float, default=0.1, help='Resource sampling interval in seconds')
+    parser.add_argument('--sample-buffer', type=int, default=600, help='Number of resource samples kept per test')
     args = parser.parse_args()
     
-    benchmark = FFmpegBenchmark(args.output_dir)
+    concurrency_levels = parse_concurrency_levels(args.jobs, args.concurrency)
+    
+    quality_scorer = QualityScorer(args.vmaf_workers, args.vmaf_threads, args.vmaf_subsample, args.vmaf_overlap)
+    benchmark = FFmpegBenchmark(args.output_dir, quality_scorer, args.sample_interval, args.sample_buffer,
+                                args.repeat, args.warmup, args.output_sink, args.tmpfs_dir)
+    if args.worker and args.worker_group:
+        # Results are stored under the group, so several local workers can stand in for instance types
+        benchmark.instance_type = args.worker_group
+    benchmark.enable_journal(args.resume)
+    decode_cache = DecodeCache(args.cache_dir) if args.decode_cache else None
+    
+    sweep = None
+    if args.sweep == 'default':
+        sweep = DEFAULT_SWEEP
+    elif args.sweep:
+        with open(args.sweep, 'r') as f:
+            sweep = json.load(f)
     
     # Find input files
-    input_files = []
-    for file in os.listdir(args.input_dir):
-        if file.endswith(('.mp4', '.mov', '.avi', '.mkv')):
-            input_files.append(os.path.join(args.input_dir, file))
+    input_files = find_input_files(args.input_dir)
+    benchmark.input_metadata = input_files
+    
+    if args.worker:
+        client = CoordinatorClient(args.worker, f"{socket.gethostname()}-{os.getpid()}", benchmark.get_host())
+        input_dir = os.path.dirname(args.input_dir) if os.path.isfile(args.input_dir) else args.input_dir
+        benchmark.run_worker(client, input_dir, decode_cache)
+        benchmark.save_results()
+        quality_scorer.close()
+        print(f"\nWorker finished after {len(benchmark.results)} tests.")
+        return
     
     if not input_files:
         print("No input files found!")
@@ -271,13 +2286,40 @@ def main():
     
     print(f"Found {len(input_files)} input files")
     
-    # Run tests for each input file
+    # Run tests for each input file; an input that cannot be prepared is recorded as failed and skipped
     for input_file in input_files:
         print(f"\nTesting with: {input_file}")
-        benchmark.run_encoding_tests(input_file, args.duration)
+        try:
+            benchmark.run_encoding_tests(input_file, args.duration, decode_cache)
+            if concurrency_levels:
+                benchmark.run_concurrency_tests(input_file, concurrency_levels, args.duration, decode_cache)
+            if args.chunked:
+                benchmark.run_chunked_tests(input_file, args.chunked, args.chunk_workers, args.duration, decode_cache)
+            if args.quality_search:
+                benchmark.run_quality_search(input_file, args.quality_search, args.quality_search_mode,
+                                             [c for c in args.quality_search_codecs.split(',') if c],
+                                             args.quality_search_preset, args.quality_search_subsample, args.duration,
+                                             decode_cache)
+            if args.isa_ablation:
+                benchmark.run_isa_tests(input_file, args.duration, decode_cache)
+            if sweep:
+                benchmark.run_sweep_tests(input_file, sweep, args.duration, decode_cache)
+            if args.batch:
+                benchmark.run_batch_tests(input_file, [int(n) for n in args.batch.split(',') if n],
+                                          [t for t in (args.batch_tasks or "").split(',') if t], args.batch_workers,
+                                          args.batch_size)
+            if args.latency:
+                benchmark.run_latency_tests(input_file, args.latency_seconds, args.duration)
+            if args.density:
+                benchmark.run_density_search(input_file, args.density_window, args.density_min_speed,
+                                             args.density_pin, args.density_max)
+        except RuntimeError as e:
+            print(f"Skipping {input_file}: {e}")
+            benchmark.record_input_failure(input_file, e)
     
     # Save results
     benchmark.save_results()
+    quality_scorer.close()
     
     print(f"\nBenchmark complete! Ran {len(benchmark.results)} tests.")
 
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Content complexity tiers, from easy to hard to encode. Each tier is a lavfi
+# source rendered at the clip's size and rate; fixed seeds keep them deterministic.
+COMPLEXITY_TIERS = {
+    "low": {"source": "testsrc2", "graph": "testsrc2=size={width}x{height}:rate={fps}"},
+    "medium": {"source": "mandelbrot", "graph": "mandelbrot=size={width}x{height}:rate={fps}:maxiter=512"},
+    "high": {"source": "testsrc2+noise",
+             "graph": "testsrc2=size={width}x{height}:rate={fps},noise=alls=40:allf=t+u:all_seed=20240601"}
+}
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "2160p": (3840, 2160)}
+
+# One short 1080p30 clip per complexity tier, quick enough to build before a run; larger
+# matrices (more resolutions, longer clips, 60 fps) are passed with --plan
+DEFAULT_CORPUS = {
+    "tiers": ["low", "medium", "high"],
+    "resolutions": ["1080p"],
+    "durations": [30],
+    "frame_rates": [30]
+}
+
+# Mezzanine encode settings. x264 rate control under VBV is only repeatable single-threaded, so
+# clips are encoded on one thread with a fast preset; SEI units carrying the x264 version are dropped.
+MEZZANINE_PRESET = "veryfast"
+MEZZANINE_CRF = 18
+MEZZANINE_BITS_PER_PIXEL = 0.25
+
+def sha256sum(path, block_size=1 << 20):
+    """SHA-256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class CorpusBuilder:
+    """Generates the synthetic input corpus and its manifest.
+    
+    Every clip has a JSON sidecar recording the command that produced it and
+    its checksum. A clip is only regenerated when its command changes or its
+    file no longer matches the sidecar, so one corpus directory can be reused
+    across runs and plans.
+    """
+    def __init__(self, corpus_dir="corpus", verify=False):
+        self.corpus_dir = corpus_dir
+        self.verify = verify
+        os.makedirs(corpus_dir, exist_ok=True)
+    
+    def get_ffmpeg_version(self):
+        """FFmpeg version string"""
+        try:
+            result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
+            return result.stdout.split('\n')[0]
+        except:
+            return "unknown"
+    
+    def expand(self, plan):
+        """Expand a corpus plan into clip specs"""
+        clips = []
+        for tier in plan["tiers"]:
+            for resolution in plan["resolutions"]:
+                width, height = RESOLUTIONS[resolution]
+                for fps in plan["frame_rates"]:
+                    for duration in plan["durations"]:
+                        clips.append({
+                            "name": f"{tier}_{resolution}{fps}_{duration}s",
+                            "tier": tier,
+                            "source": COMPLEXITY_TIERS[tier]["source"],
+                            "resolution": resolution,
+                            "width": width,
+                            "height": height,
+                            "fps": fps,
+                            "duration": duration
+                        })
+        return clips
+    
+    def build_command(self, clip, output_file):
+        """FFmpeg command rendering one clip with a sine tone audio track"""
+        graph = COMPLEXITY_TIERS[clip["tier"]]["graph"].format(**clip)
+        maxrate = int(clip["width"] * clip["height"] * clip["fps"] * MEZZANINE_BITS_PER_PIXEL)
+        return ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                "-f", "lavfi", "-i", graph,
+                "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=48000",
+                "-t", str(clip["duration"]), "-map", "0:v", "-map", "1:a",
+                "-c:v", "libx264", "-preset", MEZZANINE_PRESET, "-crf", str(MEZZANINE_CRF),
+                "-maxrate", str(maxrate), "-bufsize", str(maxrate * 2), "-g", str(clip["fps"] * 2),
+                "-pix_fmt", "yuv420p", "-threads", "1", "-bsf:v", "filter_units=remove_types=6",
+                "-c:a", "aac", "-b:a", "128k", "-map_metadata", "-1",
+                "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact",
+                "-movflags", "+faststart", output_file]
+    
+    def cached(self, clip, key):
+        """Sidecar of an existing clip built from the same command, if its file still matches"""
+        sidecar_file = os.path.join(self.corpus_dir, f"{clip['name']}.json")
+        clip_file = os.path.join(self.corpus_dir, f"{clip['name']}.mp4")
+        if not (os.path.exists(sidecar_file) and os.path.exists(clip_file)):
+            return None
+        try:
+            with open(sidecar_file, 'r') as f:
+                sidecar = json.load(f)
+        except:
+            return None
+        if sidecar.get("key") != key or sidecar.get("size") != os.path.getsize(clip_file):
+            return None
+        if self.verify and sha256sum(clip_file) != sidecar.get("sha256"):
+            print(f"Checksum mismatch for {clip['name']}, regenerating")
+            return None
+        return sidecar
+    
+    def build_clip(self, clip):
+        """Generate one clip unless an identical one is cached"""
+        clip_file = os.path.join(self.corpus_dir, f"{clip['name']}.mp4")
+        partial_file = os.path.join(self.corpus_dir, f".{clip['name']}.part.mp4")
+        cmd = self.build_command(clip, "{output}")
+        key = hashlib.sha256(json.dumps(cmd).encode()).hexdigest()
+        
+        sidecar = self.cached(clip, key)
+        if sidecar:
+            print(f"Cached: {clip['name']}")
+            return sidecar
+        
+        print(f"Generating: {clip['name']} ({clip['source']}, {clip['width']}x{clip['height']} @ {clip['fps']} fps, "
+              f"{clip['duration']}s)")
+        start_time = time.time()
+        result = subprocess.run([partial_file if arg == "{output}" else arg for arg in cmd],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            if os.path.exists(partial_file):
+                os.remove(partial_file)
+            raise RuntimeError(f"ffmpeg failed for {clip['name']}: {result.stderr.strip()[-500:]}")
+        os.replace(partial_file, clip_file)
+        
+        sidecar = dict(clip, key=key, command=' '.join(cmd), sha256=sha256sum(clip_file),
+                       size=os.path.getsize(clip_file), seconds=time.time() - start_time,
+                       ffmpeg_version=self.get_ffmpeg_version(), created=datetime.now().isoformat())
+        with open(os.path.join(self.corpus_dir, f"{clip['name']}.json"), 'w') as f:
+            json.dump(sidecar, f, indent=2)
+        print(f"Generated {clip['name']} in {sidecar['seconds']:.1f}s ({sidecar['size'] / 1024**2:.1f} MB)")
+        return sidecar
+    
+    def build(self, plan, manifest_name="manifest.json"):
+        """Build every clip of a plan and write the manifest listing them"""
+        clips = []
+        for clip in self.expand(plan):
+            sidecar = self.build_clip(clip)
+            clips.append(dict(clip, file=f"{clip['name']}.mp4", sha256=sidecar["sha256"], size=sidecar["size"]))
+        
+        manifest = {
+            "created": datetime.now().isoformat(),
+            "ffmpeg_version": self.get_ffmpeg_version(),
+            "plan": plan,
+            "clips": clips
+        }
+        manifest_file = os.path.join(self.corpus_dir, manifest_name)
+        with open(manifest_file, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        print(f"Manifest with {len(clips)} clips saved to: {manifest_file}")
+        return manifest_file
+
+def parse_list(value, cast=str):
+    """Parse a comma-separated option"""
+    return [cast(item) for item in value.split(',') if item]
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a synthetic FFmpeg benchmark input corpus')
+    parser.add_argument('--corpus-dir', default='corpus', help='Directory for generated clips and the manifest')
+    parser.add_argument('--plan', help='JSON corpus plan (same shape as DEFAULT_CORPUS in build-corpus.py)')
+    parser.add_argument('--tiers', help=f'Comma-separated complexity tiers ({", ".join(COMPLEXITY_TIERS)})')
+    parser.add_argument('--resolutions', help=f'Comma-separated resolutions ({", ".join(RESOLUTIONS)})')
+    parser.add_argument('--durations', help='Comma-separated clip durations in seconds')
+    parser.add_argument('--frame-rates', help='Comma-separated frame rates')
+    parser.add_argument('--manifest', default='manifest.json', help='Manifest file name inside the corpus directory')
+    parser.add_argument('--verify', action='store_true', help='Re-check cached clips against their SHA-256 checksums')
+    args = parser.parse_args()
+    
+    plan = dict(DEFAULT_CORPUS)
+    if args.plan:
+        with open(args.plan, 'r') as f:
+            plan.update(json.load(f))
+    if args.tiers:
+        plan["tiers"] = parse_list(args.tiers)
+    if args.resolutions:
+        plan["resolutions"] = parse_list(args.resolutions)
+    if args.durations:
+        plan["durations"] = parse_list(args.durations, int)
+    if args.frame_rates:
+        plan["frame_rates"] = parse_list(args.frame_rates, int)
+    
+    unknown = [t for t in plan["tiers"] if t not in COMPLEXITY_TIERS] + \
+              [r for r in plan["resolutions"] if r not in RESOLUTIONS]
+    if unknown:
+        print(f"Unknown tiers or resolutions: {', '.join(unknown)}")
+        sys.exit(1)
+    
+    builder = CorpusBuilder(args.corpus_dir, args.verify)
+    try:
+        builder.build(plan, args.manifest)
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,16 @@
 
 # Full FFmpeg Benchmark Execution Script
 # Run this on both x86 and Graviton instances
-# Usage: ./run-full-benchmark.sh [duration]
+# Usage: ./run-full-benchmark.sh [duration] [content]
 # duration: time in seconds (default: 60) or "FULL" for entire video
+# content: "download" (default) fetches the Big Buck Bunny clip into input/ when it is empty,
+#          "corpus" builds the synthetic corpus instead (offline, reproducible)
 
 set -e
 
 # Parse duration parameter
 DURATION=${1:-FULL}
+CONTENT=${2:-download}
 echo "Starting FFmpeg benchmark suite with duration: $DURATION"
 
 # change to benchmark dir
@@ -20,23 +23,43 @@ if ! command -v ffmpeg &> /dev/null; then
     exit 1
 fi
 
-# Check for input files
-if [ ! "$(ls -A input/)" ]; then
-    echo "No input files found. Downloading benchmark videos..."
-    cd input
+download_inputs() {
+    echo "Downloading benchmark videos..."
     
     # Download standard benchmark videos
-    wget -O big_buck_bunny_1080p.mp4 "https://raw.githubusercontent.com/chintan9/Big-Buck-Bunny/refs/heads/master/BigBuckBunny1080p30s.mp4"
-        
-    cd ..
+    if ! wget -O input/big_buck_bunny_1080p.mp4 "https://raw.githubusercontent.com/chintan9/Big-Buck-Bunny/refs/heads/master/BigBuckBunny1080p30s.mp4"; then
+        rm -f input/big_buck_bunny_1080p.mp4
+        return 1
+    fi
+}
+
+build_corpus() {
+    echo "Building synthetic test corpus..."
+    
+    # The default plan is small (30-second 1080p30 clips); cached clips are reused
+    python3 ../build-corpus.py --corpus-dir corpus || return 1
+    INPUT=corpus/manifest.json
+}
+
+# Check for input files
+INPUT=input
+mkdir -p input output
+if [ ! "$(ls -A input/)" ]; then
+    echo "No input files found."
+    if [ "$CONTENT" = "corpus" ]; then
+        build_corpus
+    elif ! download_inputs; then
+        echo "Download failed, falling back to the synthetic corpus."
+        build_corpus
+    fi
 fi
 
 # Run the benchmark
 echo "Starting benchmark execution..."
 if [ "$DURATION" = "FULL" ]; then
-    python3 ../benchmark-runner.py --input-dir input --output-dir results
+    python3 ../benchmark-runner.py --input-dir $INPUT --output-dir results
 else
-    python3 ../benchmark-runner.py --input-dir input --output-dir results --duration $DURATION
+    python3 ../benchmark-runner.py --input-dir $INPUT --output-dir results --duration $DURATION
 fi
 
 # Generate analysis if we have results from multiple architectures
@@ -53,6 +76,10 @@ echo "Logs saved in: $(pwd)/logs/"
 echo ""
 echo "=== Quick Summary ==="
 echo "Architecture: $(uname -m)"
-echo "Test files processed: $(ls input/ | wc -l)"
+if [ "$INPUT" = "corpus/manifest.json" ]; then
+    echo "Test files processed: $(python3 -c 'import json, sys; print(len(json.load(open(sys.argv[1]))["clips"]))' $INPUT)"
+else
+    echo "Test files processed: $(ls input/ | wc -l)"
+fi
 echo "Results generated: $(ls results/*.json 2>/dev/null | wc -l)"
 echo "Output files created: $(ls output/ 2>/dev/null | wc -l)"
\ No newline at end of file